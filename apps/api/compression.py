@@ -0,0 +1,254 @@
+'''
+
+Negotiated Response Compression (ASGI Middleware)
+
+Compresses responses using brotli (when installed) or gzip, as negotiated from the "Accept-Encoding" header.
+
+Important Notes:
+    Bodies smaller than the threshold, non-textual content types, partial (206) and pre-encoded responses are sent as-is
+    Every response which could be compressed carries "Vary: Accept-Encoding" (compressed or not)
+    Streamed responses are compressed incrementally (every chunk is flushed so it reaches the client immediately)
+    Compressed bodies of 200 responses carrying an ETag are cached (LRU, keyed by path, query string & ETag),
+    and their ETag is sent as a weak validator
+
+Usage:
+    app.asgi_app = Compression(app.asgi_app, threshold=1024)
+
+'''
+
+
+import zlib
+
+import typing as t
+
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+compressible = ('text/', 'application/json', 'application/javascript', 'application/xml')
+
+
+def negotiate(header: str) -> t.Optional[str]:
+    ''' Selects the preferred supported encoding ("br" over "gzip" when equally weighted) '''
+
+    supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+    weights = {}
+
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        weight = 1.0
+
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+
+        weights[coding.strip().lower()] = weight
+
+    wildcard = weights.get('*', 0.0)
+    ranked = [(weights.get(coding, wildcard), -index, coding) for index, coding in enumerate(supported)]
+    weight, _, coding = max(ranked)
+
+    return coding if weight > 0 else None
+
+
+class Compressor():
+    ''' Incremental Compressor for a Single Response '''
+
+    def __init__(self, encoding: str, *, level: int):
+        self.encoding = encoding
+
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=min(level, 11))
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.process(data) + self._compressor.flush()
+
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.finish()
+
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class Compression():
+    ''' Response Compression Middleware '''
+
+    def __init__(self, app: t.Callable, *, threshold: int = 1024, level: int = 6, cache: int = 256):
+        self.app = app
+        self.threshold = threshold
+        self.level = level
+
+        self.cache = OrderedDict()
+        self.cache_size = cache
+
+    def _cached(self, key: t.Optional[tuple], encoding: str, body: bytes) -> bytes:
+        if key is not None:
+            key = (*key, encoding)
+
+            compressed = self.cache.get(key)
+            if compressed is not None:
+                self.cache.move_to_end(key)
+                return compressed
+
+        compressor = Compressor(encoding, level=self.level)
+        compressed = compressor.compress(body) + compressor.finish()
+
+        if key is not None:
+            self.cache[key] = compressed
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        return compressed
+
+    async def __call__(self, scope: dict, receive: t.Callable, send: t.Callable) -> None:
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        headers = dict((name.lower(), value) for name, value in scope.get('headers', []))
+        encoding = negotiate(headers.get(b'accept-encoding', b'').decode('latin-1'))
+
+        if scope['method'] == 'HEAD':
+            encoding = None
+
+        resource = (scope.get('raw_path') or scope['path'].encode()) + b'?' + scope.get('query_string', b'')
+
+        await self.app(scope, receive, Responder(self, encoding, send, resource=resource))
+
+
+class Responder():
+    ''' Wraps the ASGI `send` callable of a single response '''
+
+    def __init__(self, middleware: Compression, encoding: t.Optional[str], send: t.Callable, *, resource: bytes):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.resource = resource
+
+        self.start = None
+        self.length = None
+        self.buffer = []
+        self.compressor = None
+        self.passthrough = False
+        self.finished = False
+
+    @staticmethod
+    def _eligible(status: int, headers: dict) -> bool:
+        content = headers.get(b'content-type', b'').decode('latin-1')
+
+        if status in (204, 206, 304) or b'content-encoding' in headers or b'content-range' in headers:
+            return False
+
+        return content.startswith(compressible)
+
+    @staticmethod
+    def _vary(headers: list) -> list:
+        ''' Adds "Accept-Encoding" to the "Vary" header (unless it is already covered) '''
+
+        for name, value in headers:
+            if name.lower() == b'vary' and (value.strip() == b'*' or b'accept-encoding' in value.lower()):
+                return list(headers)
+
+        return [*headers, (b'vary', b'Accept-Encoding')]
+
+    def _key(self) -> t.Optional[tuple]:
+        ''' Compressed bodies are only cached for complete (200) responses carrying an ETag '''
+
+        etag = dict((name.lower(), value) for name, value in self.start['headers']).get(b'etag')
+
+        if self.start['status'] != 200 or not etag:
+            return None
+
+        return (self.resource, etag)
+
+    def _headers(self, *, length: int = None) -> list:
+        headers = []
+        for name, value in self.start['headers']:
+            lowered = name.lower()
+
+            if lowered == b'content-length':
+                continue
+
+            if lowered == b'etag' and not value.startswith(b'W/'):
+                value = b'W/' + value
+
+            headers.append((name, value))
+
+        headers.append((b'content-encoding', self.encoding.encode()))
+
+        if length is not None:
+            headers.append((b'content-length', str(length).encode()))
+
+        return headers
+
+    async def __call__(self, message: dict) -> None:
+        if message['type'] == 'http.response.start':
+            headers = dict((name.lower(), value) for name, value in message['headers'])
+            length = headers.get(b'content-length')
+
+            self.start = message
+            self.length = int(length) if length is not None else None
+
+            # Responses which could be compressed vary by "Accept-Encoding", even when sent as-is
+            eligible = self._eligible(message['status'], headers)
+            if eligible:
+                self.start = {**message, 'headers': self._vary(message['headers'])}
+
+            small = self.length is not None and self.length < self.middleware.threshold
+            self.passthrough = not eligible or self.encoding is None or small
+
+            if self.passthrough:
+                await self.send(self.start)
+
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            return await self.send(message)
+
+        if self.finished:
+            return
+
+        body = message.get('body', b'')
+        more = message.get('more_body', False)
+
+        # Bodies of a known length are buffered (Quart terminates them with an empty chunk), so they can be cached
+        if self.compressor is None and self.length is not None:
+            self.buffer.append(body)
+            body = b''.join(self.buffer)
+
+            if more and len(body) < self.length:
+                return
+
+            self.buffer, more = [], False
+            self.finished = True
+
+        if self.compressor is None and not more:
+            if len(body) < self.middleware.threshold:
+                await self.send(self.start)
+                return await self.send({'type': 'http.response.body', 'body': body, 'more_body': False})
+
+            compressed = self.middleware._cached(self._key(), self.encoding, body)
+
+            await self.send({**self.start, 'headers': self._headers(length=len(compressed))})
+            return await self.send({'type': 'http.response.body', 'body': compressed, 'more_body': False})
+
+        if self.compressor is None:
+            self.compressor = Compressor(self.encoding, level=self.middleware.level)
+            await self.send({**self.start, 'headers': self._headers()})
+
+        output = self.compressor.compress(body) if body else b''
+        if not more:
+            output += self.compressor.finish()
+
+        await self.send({'type': 'http.response.body', 'body': output, 'more_body': more})
@@ -0,0 +1,78 @@
+'''
+
+Runtime Configuration
+
+Environment variables (and the ".env" file) are parsed exactly once, on first access,
+and exposed as a typed, immutable settings object shared by every module of the API.
+
+'''
+
+
+import functools
+
+from os import environ
+from dataclasses import dataclass
+
+
+def _int(name: str, default: int = None) -> int:
+    value = environ.get(name)
+
+    return int(value) if value else default
+
+
+@dataclass(frozen=True)
+class Settings():
+    '''
+        Contains API Configuration.
+
+        - Authentication Database
+        - Main Database
+        - Service Login (Connected Routes & Background Tasks)
+        - Logging
+        - Administration
+    '''
+
+    auth_host: str = None
+    auth_port: int = None
+    auth_user: str = None
+    auth_password: str = None
+
+    psql_host: str = None
+    psql_port: int = None
+
+    service_user: str = None
+    service_password: str = None
+
+    log_collector: str = None
+    log_format: str = 'text'
+
+    profiler_key: str = None
+
+    @classmethod
+    def from_env(cls) -> 'Settings':
+        return cls(
+            auth_host = environ.get('AUTH_PSQL_HOST'),
+            auth_port = _int('AUTH_PSQL_PORT'),
+            auth_user = environ.get('AUTH_PSQL_USER'),
+            auth_password = environ.get('AUTH_PSQL_PASS'),
+
+            psql_host = environ.get('PSQL_HOST'),
+            psql_port = _int('PSQL_PORT', _int('PQSL_PORT')),
+
+            service_user = environ.get('PSQL_SERVICE_USER'),
+            service_password = environ.get('PSQL_SERVICE_PASS'),
+
+            log_collector = environ.get('LOG_COLLECTOR'),
+            log_format = environ.get('LOG_FORMAT', 'text'),
+
+            profiler_key = environ.get('PROFILER_KEY')
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    return Settings.from_env()
@@ -11,11 +11,11 @@ class BaseException(Exception):
         'Please try again later or contact support if the problem persists.'
     )
 
-    def __init__(self, reason: str = default):
-        self.reason = reason
+    def __init__(self, reason: str = None):
+        self.reason = reason or self.default
 
-    async def handle(self) -> quart.Response:
-        return await make_response(self.status, self.reason)
+    async def handle(self) -> Response:
+        return await make_response(self.reason, self.status)
 
 
 class MissingAuthentication(BaseException):
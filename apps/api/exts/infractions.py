@@ -0,0 +1,314 @@
+'''
+
+Infractions Extension (Global and Guild-Based)
+
+Every (guild, user) pair has a precomputed summary which is updated in the same transaction
+an infraction is issued or expires, so escalation checks and "is muted" lookups are a single keyed read.
+Global infractions are stored using Guild ID 0.
+
+Summary:
+    - Active Count per Type     (warn, mute, kick, ban)
+    - Points                    Weighted infractions, decaying with a configurable half-life
+    - Next Expiry               Earliest expiration of an active infraction
+    - Muted Until               Latest expiration of an active mute
+
+Tables:
+    "Infractions"
+        "ID" BIGSERIAL PRIMARY KEY, "Guild ID" BIGINT, "User ID" BIGINT, "Type" TEXT, "Weight" DOUBLE PRECISION,
+        "Reason" TEXT, "Moderator ID" BIGINT, "Issued At" TIMESTAMPTZ, "Expires At" TIMESTAMPTZ, "Active" BOOLEAN
+
+    "InfractionSummaries"   (Primary Key: "Guild ID", "User ID" - required by the upserts)
+        "Guild ID" BIGINT, "User ID" BIGINT, "Warns" INTEGER, "Mutes" INTEGER, "Kicks" INTEGER, "Bans" INTEGER,
+        "Points" DOUBLE PRECISION, "Decayed At" TIMESTAMPTZ, "Next Expiry" TIMESTAMPTZ, "Muted Until" TIMESTAMPTZ
+
+    Timestamps must be TIMESTAMPTZ (decay is computed from now() - "Decayed At" / "Issued At")
+
+Important Notes:
+    Points are stored alongside the time they were last decayed, and decayed on read
+    Summaries with a passed "Next Expiry" are refreshed when read (or by the expiry sweep)
+    Summaries can be rebuilt in bulk from the infraction history if they ever drift
+
+Routes:
+    POST    /infractions/<guild>/<user>             {"type": "mute", "duration": 3600, "reason": "...", "moderator": 0}
+    GET     /infractions/<guild>/<user>/summary
+    POST    /infractions/expire
+    POST    /infractions/rebuild                    {"guild": 0} (Optional)
+
+'''
+
+
+import asyncpg
+
+import typing as t
+
+from quart import request
+from quart import Blueprint
+from datetime import datetime
+from datetime import timezone
+from datetime import timedelta
+
+from utils import Decorators
+from logger import getLogger
+from exceptions import MissingRequestData
+
+
+log = getLogger()
+
+infractions = Blueprint('infractions', __name__, url_prefix='/infractions')
+
+
+columns = {
+    'warn': 'Warns',
+    'mute': 'Mutes',
+    'kick': 'Kicks',
+    'ban': 'Bans'
+}
+
+weights = {
+    'warn': 1.0,
+    'mute': 2.0,
+    'kick': 3.0,
+    'ban': 5.0
+}
+
+escalation = [
+    (10.0, 'ban'),
+    (6.0, 'kick'),
+    (3.0, 'mute'),
+    (0.0, 'warn')
+]
+
+
+class InfractionSummary():
+    ''' Precomputed Per-(Guild, User) Infraction Summaries '''
+
+    half_life: timedelta = timedelta(days=30)
+
+    @classmethod
+    def decay(cls, points: float, since: datetime, *, now: datetime = None) -> float:
+        elapsed = ((now or datetime.now(timezone.utc)) - since).total_seconds()
+
+        return points * 0.5 ** (max(elapsed, 0) / cls.half_life.total_seconds())
+
+    '''
+        Updates
+    '''
+
+    @classmethod
+    async def issue(cls, db: asyncpg.Connection, guild: int, user: int, type: str, *, duration: int = None, weight: float = None, reason: str = None, moderator: int = None) -> int:
+        ''' Records the infraction and folds it into the summary within one transaction '''
+
+        column = columns[type]
+        weight = weights[type] if weight is None else weight
+        expires = datetime.now(timezone.utc) + timedelta(seconds=duration) if duration else None
+
+        async with db.transaction():
+            id = await db.fetchval('''
+                INSERT INTO "Infractions"
+                ("Guild ID", "User ID", "Type", "Weight", "Reason", "Moderator ID", "Issued At", "Expires At", "Active")
+                VALUES ($1, $2, $3, $4, $5, $6, now(), $7, TRUE)
+                RETURNING "ID"
+            ''', guild, user, type, weight, reason, moderator, expires)
+
+            await db.execute(f'''
+                INSERT INTO "InfractionSummaries" AS S
+                ("Guild ID", "User ID", "{column}", "Points", "Decayed At", "Next Expiry", "Muted Until")
+                VALUES ($1, $2, 1, $3, now(), $4, $5)
+                ON CONFLICT ("Guild ID", "User ID") DO UPDATE SET
+                    "{column}" = S."{column}" + 1,
+                    "Points" = S."Points" * power(0.5, extract(epoch FROM now() - S."Decayed At") / $6) + EXCLUDED."Points",
+                    "Decayed At" = now(),
+                    "Next Expiry" = LEAST(S."Next Expiry", EXCLUDED."Next Expiry"),
+                    "Muted Until" = GREATEST(S."Muted Until", EXCLUDED."Muted Until")
+            ''', guild, user, weight, expires, expires if type == 'mute' else None, cls.half_life.total_seconds())
+
+        log.debug('infractions', f'Issued {type.title()} #{id} (Guild: {guild}, User: {user})')
+
+        return id
+
+    @classmethod
+    async def rebuild(cls, db: asyncpg.Connection, *, guild: int = None, keys: t.Sequence[t.Tuple[int, int]] = None) -> int:
+        '''
+            Recomputes summaries from the infraction history
+
+            - Guild     Rebuilds every summary of the guild
+            - Keys      Rebuilds the provided (guild, user) pairs
+            - Neither   Rebuilds every summary
+        '''
+
+        filters, args = [], [cls.half_life.total_seconds()]
+
+        if guild is not None:
+            args.append(guild)
+            filters.append(f'"Guild ID" = ${len(args)}')
+
+        if keys is not None:
+            args.extend([[key[0] for key in keys], [key[1] for key in keys]])
+            filters.append(f'("Guild ID", "User ID") IN (SELECT * FROM unnest(${len(args) - 1}::BIGINT[], ${len(args)}::BIGINT[]))')
+
+        where = f'WHERE {" AND ".join(filters)}' if filters else ''
+        counts = ',\n                '.join(
+            f'COUNT(*) FILTER (WHERE "Active" AND "Type" = \'{type}\')' for type in columns
+        )
+
+        status = await db.execute(f'''
+            INSERT INTO "InfractionSummaries" AS S
+            ("Guild ID", "User ID", {", ".join(f'"{column}"' for column in columns.values())}, "Points", "Decayed At", "Next Expiry", "Muted Until")
+            SELECT
+                "Guild ID", "User ID",
+                {counts},
+                SUM("Weight" * power(0.5, extract(epoch FROM now() - "Issued At") / $1)),
+                now(),
+                MIN("Expires At") FILTER (WHERE "Active"),
+                MAX("Expires At") FILTER (WHERE "Active" AND "Type" = 'mute')
+            FROM "Infractions"
+            {where}
+            GROUP BY "Guild ID", "User ID"
+            ON CONFLICT ("Guild ID", "User ID") DO UPDATE SET
+                {", ".join(f'"{column}" = EXCLUDED."{column}"' for column in columns.values())},
+                "Points" = EXCLUDED."Points",
+                "Decayed At" = EXCLUDED."Decayed At",
+                "Next Expiry" = EXCLUDED."Next Expiry",
+                "Muted Until" = EXCLUDED."Muted Until"
+        ''', *args)
+
+        return int(status.split()[-1])
+
+    @classmethod
+    async def expire(cls, db: asyncpg.Connection, *, keys: t.Sequence[t.Tuple[int, int]] = None) -> int:
+        ''' Deactivates expired infractions and refreshes the affected summaries '''
+
+        async with db.transaction():
+            if keys is None:
+                rows = await db.fetch('''
+                    UPDATE "Infractions" SET "Active" = FALSE
+                    WHERE "Active" AND "Expires At" <= now()
+                    RETURNING "Guild ID", "User ID"
+                ''')
+            else:
+                rows = await db.fetch('''
+                    UPDATE "Infractions" SET "Active" = FALSE
+                    WHERE "Active" AND "Expires At" <= now()
+                    AND ("Guild ID", "User ID") IN (SELECT * FROM unnest($1::BIGINT[], $2::BIGINT[]))
+                    RETURNING "Guild ID", "User ID"
+                ''', [key[0] for key in keys], [key[1] for key in keys])
+
+            affected = list(keys) if keys is not None else list({(row[0], row[1]) for row in rows})
+            if affected:
+                await cls.rebuild(db, keys=affected)
+
+        log.trace('infractions', f'Expired {len(rows)} Infractions ({len(affected)} Summaries Refreshed)')
+
+        return len(rows)
+
+    '''
+        Lookups
+    '''
+
+    @classmethod
+    async def get(cls, db: asyncpg.Connection, guild: int, user: int) -> dict:
+        query = ''' SELECT * FROM "InfractionSummaries" WHERE "Guild ID" = $1 AND "User ID" = $2 '''
+
+        row = await db.fetchrow(query, guild, user)
+        now = datetime.now(timezone.utc)
+
+        if row is not None and row['Next Expiry'] is not None and row['Next Expiry'] <= now:
+            await cls.expire(db, keys=[(guild, user)])
+            row = await db.fetchrow(query, guild, user)
+
+        if row is None:
+            return {
+                'guild': guild, 'user': user, 'points': 0.0, 'next_expiry': None, 'muted_until': None,
+                **{type: 0 for type in columns}
+            }
+
+        return {
+            'guild': guild,
+            'user': user,
+            'points': cls.decay(row['Points'], row['Decayed At'], now=now),
+            'next_expiry': row['Next Expiry'],
+            'muted_until': row['Muted Until'],
+            **{type: row[column] for type, column in columns.items()}
+        }
+
+    @classmethod
+    async def is_muted(cls, db: asyncpg.Connection, guild: int, user: int) -> bool:
+        muted = (await cls.get(db, guild, user))['muted_until']
+
+        return muted is not None and muted > datetime.now(timezone.utc)
+
+    @staticmethod
+    def action(points: float) -> str:
+        return next(action for threshold, action in escalation if points >= threshold)
+
+    @classmethod
+    async def escalate(cls, db: asyncpg.Connection, guild: int, user: int) -> str:
+        ''' Returns the recommended action for the user's next infraction '''
+
+        return cls.action((await cls.get(db, guild, user))['points'])
+
+
+'''
+    Routes
+'''
+
+
+def _bigint(data: dict, key: str) -> t.Optional[int]:
+    value = data.get(key)
+
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool) or not -2 ** 63 <= value < 2 ** 63):
+        raise MissingRequestData(f'"{key}" must be a 64-bit integer ID')
+
+    return value
+
+
+@infractions.route('/<int:guild>/<int:user>', methods=['POST'])
+@Decorators.connected('Infractions')
+@Decorators.modifier
+async def issue(db: asyncpg.Connection, guild: int, user: int):
+    data = await request.get_json()
+
+    if data.get('type') not in columns:
+        raise MissingRequestData(f'Type must be one of: {", ".join(columns)}')
+
+    for key in ('duration', 'weight'):
+        if not isinstance(data.get(key, 0), (int, float, type(None))) or isinstance(data.get(key), bool):
+            raise MissingRequestData(f'"{key}" must be a number')
+
+    if not isinstance(data.get('reason', ''), (str, type(None))):
+        raise MissingRequestData('"reason" must be a string')
+
+    id = await InfractionSummary.issue(
+        db, guild, user, data['type'],
+        duration = data.get('duration'),
+        weight = data.get('weight'),
+        reason = data.get('reason'),
+        moderator = _bigint(data, 'moderator')
+    )
+
+    return {'id': id, 'summary': await InfractionSummary.get(db, guild, user)}
+
+
+@infractions.route('/<int:guild>/<int:user>/summary', methods=['GET'])
+@Decorators.connected('Infractions')
+async def summary(db: asyncpg.Connection, guild: int, user: int):
+    summary = await InfractionSummary.get(db, guild, user)
+    summary['escalation'] = InfractionSummary.action(summary['points'])
+
+    return summary
+
+
+@infractions.route('/expire', methods=['POST'])
+@Decorators.connected('Infractions')
+async def expire(db: asyncpg.Connection):
+    return {'expired': await InfractionSummary.expire(db)}
+
+
+@infractions.route('/rebuild', methods=['POST'])
+@Decorators.connected('Infractions')
+async def rebuild(db: asyncpg.Connection):
+    data = await request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        raise MissingRequestData('Expected a JSON object')
+
+    return {'rebuilt': await InfractionSummary.rebuild(db, guild=_bigint(data, 'guild'))}
@@ -0,0 +1,280 @@
+'''
+
+Experience (Leveling) Extension
+
+Levels are never computed one member at a time. Each curve precomputes a threshold table
+(total XP required to reach every level) and whole columns of XP are resolved with a single
+`numpy.searchsorted` call. Changed levels are written back with one `COPY` into a temporary table,
+followed by a single upsert.
+
+Curve:
+    XP required to advance from level N to N + 1 --> a * N^2 + b * N + c
+    Default coefficients (5, 50, 100)
+
+Important Notes:
+    NumPy is imported on first use, so it never adds to the startup time of `import main`
+
+Routes:
+    POST    /leveling/<guild>/recompute     {"curve": [a, b, c], "rewards": {"level": role}}
+    POST    /leveling/<guild>/import        {"curve": [a, b, c], "rewards": {...}, "users": [...], "xp": [...]}
+    POST    /leveling/<guild>/reset         {"rewards": {...}}
+
+    Responses contain the number of updated members, along with the roles to grant/revoke per member
+
+'''
+
+
+import asyncpg
+import functools
+
+import typing as t
+
+from quart import request
+from quart import Blueprint
+
+from utils import Decorators
+from logger import getLogger
+from exceptions import MissingRequestData
+
+if t.TYPE_CHECKING:
+    import numpy as np
+
+
+log = getLogger()
+
+leveling = Blueprint('leveling', __name__, url_prefix='/leveling')
+
+
+class LevelCurve():
+    ''' Precomputed Level-Threshold Table '''
+
+    def __init__(self, coefficients: t.Sequence[int] = (5, 50, 100), *, max_level: int = 1000):
+        import numpy as np
+
+        self.coefficients = tuple(coefficients)
+
+        level = np.arange(max_level, dtype=np.int64)
+        required = np.polyval(np.asarray(self.coefficients, dtype=np.int64), level)
+
+        self.thresholds = np.cumsum(required)
+
+    @classmethod
+    @functools.lru_cache(maxsize=32)
+    def get(cls, coefficients: t.Tuple[int, ...] = (5, 50, 100)) -> 'LevelCurve':
+        return cls(coefficients)
+
+    def levels(self, xp: 'np.ndarray') -> 'np.ndarray':
+        import numpy as np
+
+        return np.searchsorted(self.thresholds, xp, side='right').astype(np.int32)
+
+    def level(self, xp: int) -> int:
+        import numpy as np
+
+        return int(self.levels(np.asarray([xp]))[0])
+
+
+class RoleRewards():
+    ''' Level-Ordered Role Rewards '''
+
+    def __init__(self, rewards: t.Dict[int, int] = None):
+        import numpy as np
+
+        ordered = sorted((int(level), int(role)) for level, role in (rewards or {}).items())
+
+        self.levels = np.asarray([level for level, _ in ordered], dtype=np.int32)
+        self.roles = [role for _, role in ordered]
+
+    def diff(self, users: 'np.ndarray', before: 'np.ndarray', after: 'np.ndarray') -> dict:
+        ''' Roles to grant/revoke for every member whose set of earned rewards changed '''
+
+        import numpy as np
+
+        if not self.roles:
+            return {}
+
+        earned = np.searchsorted(self.levels, before, side='right')
+        earning = np.searchsorted(self.levels, after, side='right')
+
+        changes = {}
+        for index in np.flatnonzero(earned != earning):
+            old, new = earned[index], earning[index]
+            changes[int(users[index])] = {
+                'granted': self.roles[old:new],
+                'revoked': self.roles[new:old]
+            }
+
+        return changes
+
+
+class Experience():
+    ''' Bulk Experience Operations '''
+
+    @staticmethod
+    async def _fetch(db: asyncpg.Connection, guild: int) -> t.Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        import numpy as np
+
+        query = ''' SELECT "User ID", "XP", "Level" FROM "Experience" WHERE "Guild ID" = $1 '''
+        rows = await db.fetch(query, guild)
+
+        users = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        xp = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        levels = np.fromiter((row[2] for row in rows), dtype=np.int32, count=len(rows))
+
+        return users, xp, levels
+
+    @staticmethod
+    async def _store(db: asyncpg.Connection, guild: int, users: 'np.ndarray', xp: 'np.ndarray', levels: 'np.ndarray') -> None:
+        async with db.transaction():
+            await db.execute('''
+                CREATE TEMPORARY TABLE "ExperienceUpdates"
+                ("User ID" BIGINT, "XP" BIGINT, "Level" INTEGER)
+                ON COMMIT DROP
+            ''')
+
+            await db.copy_records_to_table(
+                'ExperienceUpdates',
+                records = zip(users.tolist(), xp.tolist(), levels.tolist()),
+                columns = ['User ID', 'XP', 'Level']
+            )
+
+            await db.execute('''
+                INSERT INTO "Experience" ("Guild ID", "User ID", "XP", "Level")
+                SELECT $1, "User ID", "XP", "Level" FROM "ExperienceUpdates"
+                ON CONFLICT ("Guild ID", "User ID")
+                DO UPDATE SET "XP" = EXCLUDED."XP", "Level" = EXCLUDED."Level"
+            ''', guild)
+
+    @classmethod
+    async def apply(cls, db: asyncpg.Connection, guild: int, users: 'np.ndarray', xp: 'np.ndarray', before: 'np.ndarray', *, curve: LevelCurve, rewards: RoleRewards, force: bool = False) -> dict:
+        ''' Resolves levels for the XP column, stores changed rows and computes role-reward diffs '''
+
+        import numpy as np
+
+        after = curve.levels(xp)
+        changed = np.ones(len(users), dtype=bool) if force else after != before
+
+        await cls._store(db, guild, users[changed], xp[changed], after[changed])
+
+        log.debug('leveling', f'Updated {int(changed.sum())} of {len(users)} Members (Guild: {guild})')
+
+        return {
+            'updated': int(changed.sum()),
+            'rewards': rewards.diff(users[changed], before[changed], after[changed])
+        }
+
+    @classmethod
+    async def recompute(cls, db: asyncpg.Connection, guild: int, *, curve: LevelCurve, rewards: RoleRewards) -> dict:
+        users, xp, levels = await cls._fetch(db, guild)
+
+        return await cls.apply(db, guild, users, xp, levels, curve=curve, rewards=rewards)
+
+    @classmethod
+    async def load(cls, db: asyncpg.Connection, guild: int, users: t.Sequence[int], xp: t.Sequence[int], *, curve: LevelCurve, rewards: RoleRewards) -> dict:
+        import numpy as np
+
+        current, _, levels = await cls._fetch(db, guild)
+
+        users = np.asarray(users, dtype=np.int64)
+        xp = np.asarray(xp, dtype=np.int64)
+
+        before = np.zeros(len(users), dtype=np.int32)
+        if len(current):
+            order = np.argsort(current)
+            match = order[np.searchsorted(current, users, sorter=order).clip(max=len(current) - 1)]
+            known = current[match] == users
+            before[known] = levels[match[known]]
+
+        return await cls.apply(db, guild, users, xp, before, curve=curve, rewards=rewards, force=True)
+
+    @classmethod
+    async def reset(cls, db: asyncpg.Connection, guild: int, *, rewards: RoleRewards) -> dict:
+        import numpy as np
+
+        users, xp, levels = await cls._fetch(db, guild)
+
+        # Every member is written (members already at level 0 still hold XP)
+        return await cls.apply(db, guild, users, np.zeros_like(xp), levels, curve=LevelCurve.get(), rewards=rewards, force=True)
+
+
+'''
+    Routes
+'''
+
+
+def _integer(value: t.Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _curve(data: dict) -> LevelCurve:
+    coefficients = data.get('curve', [5, 50, 100])
+
+    # Thresholds must strictly increase (c > 0) and fit in 64 bits for every level
+    if (
+        not isinstance(coefficients, list) or len(coefficients) != 3
+        or not all(_integer(value) and 0 <= value <= 10 ** 9 for value in coefficients)
+        or coefficients[2] == 0
+    ):
+        raise MissingRequestData('"curve" must contain exactly 3 non-negative integers [a, b, c] (c > 0, at most 10^9)')
+
+    return LevelCurve.get(tuple(coefficients))
+
+
+def _rewards(data: dict) -> RoleRewards:
+    rewards = data.get('rewards') or {}
+
+    if not isinstance(rewards, dict) or not all(
+        isinstance(level, str) and level.isdigit() and _integer(role) for level, role in rewards.items()
+    ):
+        raise MissingRequestData('"rewards" must map levels to role ids ({"level": role})')
+
+    return RoleRewards(rewards)
+
+
+async def _options() -> t.Tuple[dict, LevelCurve, RoleRewards]:
+    data = await request.get_json()
+
+    return data, _curve(data), _rewards(data)
+
+
+def _columns(data: dict) -> t.Tuple[t.List[int], t.List[int]]:
+    users, xp = data.get('users'), data.get('xp')
+
+    if not isinstance(users, list) or not isinstance(xp, list) or len(users) != len(xp):
+        raise MissingRequestData('"users" and "xp" must be lists of equal length')
+
+    if not all(_integer(value) for value in users + xp):
+        raise MissingRequestData('"users" and "xp" must only contain integers')
+
+    if len(set(users)) != len(users):
+        raise MissingRequestData('"users" must not contain duplicate ids')
+
+    return users, xp
+
+
+@leveling.route('/<int:guild>/recompute', methods=['POST'])
+@Decorators.connected('Experience')
+@Decorators.modifier
+async def recompute(db: asyncpg.Connection, guild: int):
+    _, curve, rewards = await _options()
+
+    return await Experience.recompute(db, guild, curve=curve, rewards=rewards)
+
+
+@leveling.route('/<int:guild>/import', methods=['POST'])
+@Decorators.connected('Experience')
+@Decorators.modifier
+async def load(db: asyncpg.Connection, guild: int):
+    data, curve, rewards = await _options()
+    users, xp = _columns(data)
+
+    return await Experience.load(db, guild, users, xp, curve=curve, rewards=rewards)
+
+
+@leveling.route('/<int:guild>/reset', methods=['POST'])
+@Decorators.connected('Experience')
+@Decorators.modifier
+async def reset(db: asyncpg.Connection, guild: int):
+    _, _, rewards = await _options()
+
+    return await Experience.reset(db, guild, rewards=rewards)
@@ -0,0 +1,269 @@
+'''
+
+Statistics Extension (Guild and User-Based)
+
+Counters are recorded into per-minute buckets and downsampled in the background
+(minute --> hour --> day --> month). Every resolution has its own table and retention policy,
+and queries are planned against the coarsest resolution able to answer them, so response time
+stays flat as history grows.
+
+Resolutions:
+    minute      "MinuteStatistics"      Retained for 7 Days
+    hour        "HourlyStatistics"      Retained for 90 Days
+    day         "DailyStatistics"       Retained for 5 Years
+    month       "MonthlyStatistics"     Retained Indefinitely
+
+    Columns     "Guild ID" BIGINT, "Metric" TEXT, "Bucket" TIMESTAMPTZ, "Value" BIGINT
+                (Primary Key: "Guild ID", "Metric", "Bucket" - required by the upserts)
+
+Important Notes:
+    Downsampling recomputes the latest coarse buckets (including the current, partial bucket) as sums,
+    so each pass is idempotent and late writes are picked up by the next pass
+    Background rollups use the API's service login ("PSQL_SERVICE_USER" & "PSQL_SERVICE_PASS")
+    Every worker schedules rollups, but each pass holds an advisory lock so only one worker runs it at a time
+    Ranges are aligned to the start of their first bucket, so the first (partial) bucket is never dropped
+
+Routes:
+    POST    /statistics/<guild>             {"metric": "messages", "value": 1}
+    GET     /statistics/<guild>/<metric>    ?start=ISO-8601&end=ISO-8601&granularity=day
+
+'''
+
+
+import asyncio
+import asyncpg
+
+import typing as t
+
+from quart import Quart
+from quart import request
+from quart import Blueprint
+from datetime import datetime
+from datetime import timezone
+from datetime import timedelta
+from dataclasses import dataclass
+
+from config import get_settings
+from utils import DataEngine
+from utils import Decorators
+from logger import getLogger
+from serialization import Streamed
+from exceptions import MissingRequestData
+
+
+log = getLogger()
+
+statistics = Blueprint('statistics', __name__, url_prefix='/statistics')
+
+
+@dataclass(frozen=True)
+class Resolution():
+    '''
+        Contains a Statistics Resolution.
+
+        - Name (date_trunc field)
+        - Table
+        - Bucket Width
+        - Retention (None is Indefinite)
+    '''
+
+    name: str
+    table: str
+    width: timedelta
+    retention: timedelta = None
+
+    def retains(self, start: datetime, *, now: datetime) -> bool:
+        return self.retention is None or start >= now - self.retention
+
+
+resolutions = [
+    Resolution('minute', 'MinuteStatistics', timedelta(minutes=1), timedelta(days=7)),
+    Resolution('hour', 'HourlyStatistics', timedelta(hours=1), timedelta(days=90)),
+    Resolution('day', 'DailyStatistics', timedelta(days=1), timedelta(days=5 * 365)),
+    Resolution('month', 'MonthlyStatistics', timedelta(days=31))
+]
+
+granularities = { resolution.name: resolution for resolution in resolutions }
+
+
+class Rollups():
+    ''' Background Downsampling, Retention & Query Planning '''
+
+    interval: float = 60.0
+    lookback: int = 2
+    lock: int = 0x53544154
+
+    task: asyncio.Task = None
+
+    '''
+        Recording
+    '''
+
+    @staticmethod
+    async def record(db: asyncpg.Connection, guild: int, metric: str, value: int = 1, *, at: datetime = None) -> None:
+        await db.execute(f'''
+            INSERT INTO "{resolutions[0].table}" ("Guild ID", "Metric", "Bucket", "Value")
+            VALUES ($1, $2, date_trunc('minute', COALESCE($4, now())), $3)
+            ON CONFLICT ("Guild ID", "Metric", "Bucket")
+            DO UPDATE SET "Value" = "{resolutions[0].table}"."Value" + EXCLUDED."Value"
+        ''', guild, metric, value, at)
+
+    '''
+        Downsampling
+    '''
+
+    @classmethod
+    async def downsample(cls, db: asyncpg.Connection, *, now: datetime = None) -> None:
+        now = now or datetime.now(timezone.utc)
+
+        for fine, coarse in zip(resolutions, resolutions[1:]):
+            since = now - coarse.width * cls.lookback
+
+            status = await db.execute(f'''
+                INSERT INTO "{coarse.table}" ("Guild ID", "Metric", "Bucket", "Value")
+                SELECT "Guild ID", "Metric", date_trunc('{coarse.name}', "Bucket"), SUM("Value")
+                FROM "{fine.table}"
+                WHERE "Bucket" >= date_trunc('{coarse.name}', $1::TIMESTAMPTZ)
+                GROUP BY 1, 2, 3
+                ON CONFLICT ("Guild ID", "Metric", "Bucket")
+                DO UPDATE SET "Value" = EXCLUDED."Value"
+            ''', since)
+
+            log.trace('statistics', f'Downsampled {fine.name} --> {coarse.name} ({status.split()[-1]} Buckets)')
+
+    @staticmethod
+    async def retain(db: asyncpg.Connection, *, now: datetime = None) -> None:
+        now = now or datetime.now(timezone.utc)
+
+        for resolution in resolutions:
+            if resolution.retention is None:
+                continue
+
+            status = await db.execute(f'''
+                DELETE FROM "{resolution.table}" WHERE "Bucket" < $1
+            ''', now - resolution.retention)
+
+            log.trace('statistics', f'Expired {status.split()[-1]} {resolution.name.title()} Buckets')
+
+    @classmethod
+    async def run(cls) -> None:
+        while True:
+            try:
+                db = await DataEngine.service('Statistics')
+                try:
+                    # Session-level lock (released when the connection closes)
+                    if await db.fetchval('SELECT pg_try_advisory_lock($1)', cls.lock):
+                        await cls.downsample(db)
+                        await cls.retain(db)
+                    else:
+                        log.trace('statistics', 'Rollup Skipped (Running in Another Worker)')
+                finally:
+                    await db.close()
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as error:
+                log.error('statistics', f'Rollup Failed: {error}')
+
+            await asyncio.sleep(cls.interval)
+
+    @classmethod
+    def register(cls, app: Quart) -> None:
+        @app.before_serving
+        async def start():
+            if get_settings().service_user is None:
+                return log.warn('statistics', 'Background Rollups Disabled (Missing Service Login)')
+
+            cls.task = asyncio.get_running_loop().create_task(cls.run())
+
+        @app.after_serving
+        async def stop():
+            if cls.task is not None:
+                cls.task.cancel()
+
+    '''
+        Query Planning
+    '''
+
+    @staticmethod
+    def plan(start: datetime, granularity: str, *, now: datetime = None) -> Resolution:
+        '''
+            Selects the coarsest resolution which satisfies both the granularity and the range
+
+            Falls back to the finest resolution still retaining the start of the range
+        '''
+
+        now = now or datetime.now(timezone.utc)
+        requested = granularities[granularity].width
+
+        retained = [resolution for resolution in resolutions if resolution.retains(start, now=now)]
+        candidates = [resolution for resolution in retained if resolution.width <= requested]
+
+        if candidates:
+            return candidates[-1]
+
+        return retained[0] if retained else resolutions[-1]
+
+    @classmethod
+    def query(cls, guild: int, metric: str, start: datetime, end: datetime, granularity: str) -> t.Tuple[str, tuple]:
+        resolution = cls.plan(start, granularity)
+        field = granularity if granularities[granularity].width >= resolution.width else resolution.name
+
+        query = f'''
+            SELECT date_trunc('{field}', "Bucket") AS "Bucket", SUM("Value")::BIGINT AS "Value"
+            FROM "{resolution.table}"
+            WHERE "Guild ID" = $1 AND "Metric" = $2 AND "Bucket" >= date_trunc('{field}', $3::TIMESTAMPTZ) AND "Bucket" < $4
+            GROUP BY 1
+            ORDER BY 1
+        '''
+
+        return query, (guild, metric, start, end)
+
+
+'''
+    Routes
+'''
+
+
+def _moment(value: str, default: datetime) -> datetime:
+    if not value:
+        return default
+
+    moment = datetime.fromisoformat(value)
+
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+@statistics.route('/<int:guild>', methods=['POST'])
+@Decorators.connected('Statistics')
+@Decorators.modifier
+async def record(db: asyncpg.Connection, guild: int):
+    data = await request.get_json()
+    metric, value = data.get('metric'), data.get('value', 1)
+
+    if not isinstance(metric, str) or not metric:
+        raise MissingRequestData('"metric" must be a non-empty string')
+
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise MissingRequestData('"value" must be an integer')
+
+    await Rollups.record(db, guild, metric, value)
+
+    return {'recorded': True}
+
+
+@statistics.route('/<int:guild>/<metric>', methods=['GET'])
+@Decorators.connected('Statistics')
+async def series(db: asyncpg.Connection, guild: int, metric: str):
+    now = datetime.now(timezone.utc)
+    granularity = request.args.get('granularity', 'day')
+
+    try:
+        start = _moment(request.args.get('start'), now - timedelta(days=30))
+        end = _moment(request.args.get('end'), now)
+    except ValueError:
+        raise MissingRequestData('Invalid ISO-8601 Timestamp')
+
+    if granularity not in granularities:
+        raise MissingRequestData(f'Granularity must be one of: {", ".join(granularities)}')
+
+    query, args = Rollups.query(guild, metric, start, end, granularity)
+
+    return Streamed.response(db, query, *args)
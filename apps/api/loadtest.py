@@ -0,0 +1,278 @@
+'''
+
+End-to-End Load Testing Harness
+
+Starts the Quart `app` in-process, seeds N "ClientData" credentials (in bulk) and runs many concurrent
+simulated bot clients against a protected route and a connected route.
+
+Databases:
+    By default, every `asyncpg.connect` call is served by an in-memory, asyncpg-compatible stand-in
+    with a configurable round-trip latency. Use "--postgres" to run against the databases configured
+    in the environment instead (connected routes then require a database role for each application,
+    granted to the service login).
+
+Logging:
+    Records are written to a temporary directory (instead of "logger/data/"), and the request path only
+    prints critical ones, so the report measures the API rather than console & log file I/O.
+
+Report:
+    - Throughput (requests per second) and status codes
+    - p50/p99 latency per route
+    - Connections opened/closed and the peak number of concurrent connections
+
+Usage:
+    python loadtest.py [--credentials 100] [--clients 50] [--duration 10] [--latency 0.001] [--postgres]
+
+'''
+
+
+import shared
+
+import time
+import random
+import asyncio
+import asyncpg
+import argparse
+import tempfile
+
+import typing as t
+
+from quart import Blueprint
+from collections import Counter
+from collections import defaultdict
+
+import logger
+import security
+
+from logger import getLogger
+from utils import Decorators
+from security import UserData
+from security import Authentication
+
+
+probes = Blueprint('loadtest', __name__, url_prefix='/loadtest')
+
+
+@probes.route('/protected')
+@Decorators.protected
+async def protected():
+    return {'status': 'ok'}
+
+
+@probes.route('/connected')
+@Decorators.connected('LoadTest')
+async def connected(db: asyncpg.Connection):
+    return {'status': await db.fetchval('SELECT 1')}
+
+
+class FakeConnection():
+    ''' In-Memory asyncpg.Connection Stand-In '''
+
+    def __init__(self, database: 'FakeDatabase'):
+        self.database = database
+        self._closed = False
+
+    async def _roundtrip(self) -> None:
+        await asyncio.sleep(self.database.latency)
+
+    async def execute(self, query: str, *args) -> str:
+        await self._roundtrip()
+
+        if 'INSERT INTO "ClientData"' in query:
+            id, protocol, value = args
+            self.database.clients[id] = {'Application ID': id, 'Protocol': protocol, 'Value': value}
+
+        return 'INSERT 0 1'
+
+    async def fetchrow(self, query: str, *args) -> t.Optional[dict]:
+        await self._roundtrip()
+
+        if 'FROM "ClientData"' in query:
+            return self.database.clients.get(args[0])
+
+        return None
+
+    async def fetchval(self, query: str, *args) -> t.Any:
+        await self._roundtrip()
+
+        return 1
+
+    async def copy_records_to_table(self, table: str, *, records: t.Iterable[tuple], columns: t.Sequence[str]) -> str:
+        await self._roundtrip()
+
+        if table == 'ClientData':
+            for record in records:
+                row = dict(zip(columns, record))
+                self.database.clients[row['Application ID']] = row
+
+        return 'COPY'
+
+    def transaction(self) -> 'FakeTransaction':
+        return FakeTransaction()
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    async def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self.database.closed += 1
+            self.database.active -= 1
+
+
+class FakeTransaction():
+    ''' No-Op Transaction Context '''
+
+    async def __aenter__(self) -> 'FakeTransaction':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+class FakeDatabase():
+    ''' In-Memory Database Server with Connection Accounting '''
+
+    def __init__(self, *, latency: float = 0.001):
+        self.latency = latency
+        self.clients = {}
+
+        self.opened = 0
+        self.closed = 0
+        self.active = 0
+        self.peak = 0
+
+    async def connect(self, **kwargs) -> FakeConnection:
+        await asyncio.sleep(self.latency * 3)
+
+        self.opened += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+
+        return FakeConnection(self)
+
+
+class LoadTest():
+    ''' Concurrent Simulated Bot Clients '''
+
+    def __init__(self, app, *, credentials: int, clients: int, duration: float, database: FakeDatabase = None):
+        self.app = app
+        self.credentials = credentials
+        self.clients = clients
+        self.duration = duration
+        self.database = database
+
+        self.users = []
+        self.latencies = defaultdict(list)
+        self.statuses = Counter()
+
+    async def seed(self) -> None:
+        authentication = Authentication()
+        ids = [100000000000000000 + index for index in range(self.credentials)]
+
+        self.users = [user for user, _ in await authentication.create_logins(ids=ids)]
+
+    async def _client(self, client, deadline: float) -> None:
+        routes = ['/loadtest/protected', '/loadtest/connected']
+
+        while time.perf_counter() < deadline:
+            user: UserData = random.choice(self.users)
+            route = random.choice(routes)
+
+            start = time.perf_counter()
+            response = await client.get(
+                route,
+                query_string = {'key': user.key},
+                headers = {'client-id': str(user.id), 'client-secret': user.secret}
+            )
+            self.latencies[route].append(time.perf_counter() - start)
+            self.statuses[response.status_code] += 1
+
+    async def run(self) -> dict:
+        self.app.register_blueprint(probes)
+
+        with tempfile.TemporaryDirectory(prefix='loadtest-') as logs:
+            logger.directory = f'{logs}/'
+            security.log = getLogger('CRITICAL')
+
+            return await self._run()
+
+    async def _run(self) -> dict:
+        async with self.app.test_app() as test_app:
+            client = test_app.test_client()
+
+            await self.seed()
+            if self.database is not None:
+                self.database.opened = self.database.closed = self.database.peak = 0
+
+            started = time.perf_counter()
+            deadline = started + self.duration
+            await asyncio.gather(*(self._client(client, deadline) for _ in range(self.clients)))
+            elapsed = time.perf_counter() - started
+
+        return self.report(elapsed)
+
+    @staticmethod
+    def _percentile(samples: list, percentile: float) -> float:
+        ordered = sorted(samples)
+
+        return ordered[min(int(len(ordered) * percentile), len(ordered) - 1)] * 1000 if ordered else 0.0
+
+    def report(self, elapsed: float) -> dict:
+        total = sum(self.statuses.values())
+
+        report = {
+            'requests': total,
+            'throughput': round(total / elapsed, 2),
+            'statuses': dict(self.statuses),
+            'routes': {
+                route: {
+                    'requests': len(samples),
+                    'p50_ms': round(self._percentile(samples, 0.50), 3),
+                    'p99_ms': round(self._percentile(samples, 0.99), 3)
+                }
+                for route, samples in self.latencies.items()
+            }
+        }
+
+        if self.database is not None:
+            report['connections'] = {
+                'opened': self.database.opened,
+                'closed': self.database.closed,
+                'peak': self.database.peak
+            }
+
+        return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='API Load Testing Harness')
+    parser.add_argument('--credentials', type=int, default=100)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--latency', type=float, default=0.001, help='Simulated database round-trip (seconds)')
+    parser.add_argument('--postgres', action='store_true', help='Use the databases configured in the environment')
+    args = parser.parse_args()
+
+    database = None
+    if not args.postgres:
+        database = FakeDatabase(latency=args.latency)
+        asyncpg.connect = database.connect
+
+    from main import app
+
+    test = LoadTest(app, credentials=args.credentials, clients=args.clients, duration=args.duration, database=database)
+    report = asyncio.run(test.run())
+
+    print(f'Requests:       {report["requests"]} ({report["throughput"]} req/s)')
+    print(f'Statuses:       {report["statuses"]}')
+    for route, stats in report['routes'].items():
+        print(f'{route:<24}p50 {stats["p50_ms"]} ms\tp99 {stats["p99_ms"]} ms\t({stats["requests"]} requests)')
+
+    if 'connections' in report:
+        connections = report['connections']
+        print(f'Connections:    {connections["opened"]} opened, {connections["closed"]} closed, {connections["peak"]} peak')
+
+
+if __name__ == '__main__':
+    main()
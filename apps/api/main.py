@@ -1,3 +1,31 @@
+import shared
+
 from quart import Quart
 
+import exceptions
+
+from utils import Profiling
+from compression import Compression
+from serialization import FastJSONProvider
+from exts.leveling import leveling
+from exts.infractions import infractions
+from exts.statistics import Rollups
+from exts.statistics import statistics
+
 app = Quart(__name__)
+
+Profiling.register(app)
+FastJSONProvider.register(app)
+
+app.register_blueprint(leveling)
+app.register_blueprint(infractions)
+app.register_blueprint(statistics)
+
+Rollups.register(app)
+
+app.asgi_app = Compression(app.asgi_app)
+
+
+@app.errorhandler(exceptions.BaseException)
+async def handle(error: exceptions.BaseException):
+    return await error.handle()
@@ -4,14 +4,18 @@ import asyncpg
 import secrets
 import hashlib
 
-from os import environ
-from dotenv import load_dotenv
+import typing as t
+
+from datetime import datetime
+from datetime import timezone
+from datetime import timedelta
 from dataclasses import dataclass
 
+from config import get_settings
 from logger import getLogger, LoggerModule
 
 
-load_dotenv()
+log = getLogger()
 
 
 @dataclass
@@ -44,18 +48,21 @@ class UserData():
 
 
 class Authentication():
-    ''' Creates & Verifies User Authentication Data '''
+    '''
+        Creates, Rotates & Verifies User Authentication Data
 
-    host: str = environ.get('AUTH_PSQL_HOST')
-    port: int = int(environ.get('AUTH_PSQL_PORT'))
+        Rotated credentials keep the previous protocol & token ("Previous Protocol", "Previous Value")
+        until "Previous Expires", so both the old and new credentials verify during the overlap window
 
-    database: str = 'Authentication'
+        Connected routes log into the main database with the service login and switch to the application's role
+        ("SET ROLE"), so rotation never touches the database roles and both credentials connect during the overlap
+    '''
 
-    user: str = environ.get('AUTH_PSQL_USER')
-    password: str = environ.get('AUTH_PSQL_PASS')
+    database: str = 'Authentication'
+    overlap: timedelta = timedelta(hours=1)
 
-    def __init__(self, logger: LoggerModule = getLogger()):
-        self.log = logger
+    def __init__(self, logger: LoggerModule = None):
+        self.log = logger or log
 
         self.charbank = list(string.ascii_letters + string.digits)
         for char in ['a', 'b', 'c', 'd']:
@@ -66,17 +73,19 @@ class Authentication():
     '''
 
     def _keygen(self) -> str:
-        self.logger.trace('security', 'Generating API Key ...')
+        self.log.trace('security', 'Generating API Key ...')
 
         return secrets.token_urlsafe(24)
 
     def _secretgen(self) -> str:
-        self.logger.trace('security', 'Generating Client Secret ...')
+        self.log.trace('security', 'Generating Client Secret ...')
+
+        primary = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
 
-        return f'{secrets.choice(12)}.{secrets.token_urlsafe(12)}'
+        return f'{primary}.{secrets.token_urlsafe(12)}'
 
     def _protocolgen(self) -> str:
-        self.logger.trace('security', 'Generating Salt Protocol ...')
+        self.log.trace('security', 'Generating Salt Protocol ...')
 
         def salt(char: str) -> str:
             part = list(char + ''.join(random.choice(self.charbank) for _ in range(3)))
@@ -101,18 +110,17 @@ class Authentication():
         id = salt('c')
         secondary = salt('d')
 
-        return finalize(random.shuffle([key, primary, id, secondary]))
+        parts = [key, primary, id, secondary]
+        random.shuffle(parts)
+
+        return finalize(parts)
 
     @staticmethod
     def _build(*, key: str, id: int, secret: str, salt: str) -> str:
         primary, secondary = secret.split('.')
-        mapping = {'a': key, 'b': primary, 'c': id, 'd': secondary}
+        mapping = {'a': key, 'b': primary, 'c': str(id), 'd': secondary}
 
-        token = ''.join([char for char in salt if char in ['a', 'b', 'c', 'd', '.', '-', '=']])
-        for part in mapping:
-            token = token.replace(part, mapping[part])
-
-        return token
+        return ''.join(mapping.get(char, char) for char in salt if char in ['a', 'b', 'c', 'd', '.', '-', '='])
 
     @staticmethod
     def _digest(token: str) -> str:
@@ -124,11 +132,13 @@ class Authentication():
 
     @classmethod
     async def _connect(cls) -> asyncpg.Connection:
+        settings = get_settings()
+
         db = await asyncpg.connect(
-            host = cls.host,
-            port = cls.port,
-            user = cls.user,
-            password = cls.password,
+            host = settings.auth_host,
+            port = settings.auth_port,
+            user = settings.auth_user,
+            password = settings.auth_password,
             database = cls.database
         )
 
@@ -148,8 +158,71 @@ class Authentication():
         '''
         args = (id, salt, token)
 
-        await db.execute(query, *args)
-        await db.commit()
+        try:
+            await db.execute(query, *args)
+        finally:
+            await db.close()
+
+    async def store_many(self, credentials: t.Sequence[t.Tuple[int, str, str]]) -> None:
+        self.log.trace('security', f'Storing {len(credentials)} New Client Credentials ...')
+
+        records = [(id, salt, self._digest(token)) for id, salt, token in credentials]
+
+        db = await self._connect()
+
+        try:
+            async with db.transaction():
+                await db.copy_records_to_table(
+                    'ClientData',
+                    records = records,
+                    columns = ['Application ID', 'Protocol', 'Value']
+                )
+        finally:
+            await db.close()
+
+    async def replace_many(self, credentials: t.Sequence[t.Tuple[int, str, str]], *, overlap: timedelta) -> t.Set[int]:
+        '''
+            Rotates the stored credentials (single transaction), returning the ids which were rotated
+        '''
+
+        self.log.trace('security', f'Rotating {len(credentials)} Client Credentials ...')
+
+        records = [(id, salt, self._digest(token)) for id, salt, token in credentials]
+        expires = datetime.now(timezone.utc) + overlap
+
+        db = await self._connect()
+
+        try:
+            async with db.transaction():
+                await db.execute('''
+                    CREATE TEMPORARY TABLE "RotatedClientData"
+                    ("Application ID" BIGINT, "Protocol" TEXT, "Value" TEXT)
+                    ON COMMIT DROP
+                ''')
+
+                await db.copy_records_to_table(
+                    'RotatedClientData',
+                    records = records,
+                    columns = ['Application ID', 'Protocol', 'Value']
+                )
+
+                rows = await db.fetch('''
+                    UPDATE "ClientData" AS C SET
+                        "Previous Protocol" = C."Protocol",
+                        "Previous Value" = C."Value",
+                        "Previous Expires" = $1,
+                        "Protocol" = R."Protocol",
+                        "Value" = R."Value"
+                    FROM "RotatedClientData" AS R
+                    WHERE C."Application ID" = R."Application ID"
+                    RETURNING C."Application ID"
+                ''', expires)
+
+                rotated = {row[0] for row in rows}
+        finally:
+            await db.close()
+
+        return rotated
 
     async def retrieve(self, *, id: int) -> asyncpg.Record:
         self.log.trace('security', f'Fetching Credentials for Client (ID: {id}) ...')
@@ -157,7 +230,11 @@ class Authentication():
         db = await self._connect()
 
         query = ''' SELECT * FROM "ClientData" WHERE "Application ID" = $1 '''
-        data = await db.fetchrow(query, id)
+
+        try:
+            data = await db.fetchrow(query, id)
+        finally:
+            await db.close()
 
         return data
 
@@ -165,9 +242,7 @@ class Authentication():
         Logic Operations
     '''
 
-    async def create_login(self, *, id: int) -> UserData, AuthData:
-        self.log.debug('security', f'Generating Credentials for Application (ID: {id}) ...')
-
+    def _generate(self, id: int) -> t.Tuple[UserData, AuthData, str]:
         user = UserData()
         auth = AuthData()
 
@@ -178,23 +253,81 @@ class Authentication():
         salt = self._protocolgen()
         auth.token = self._build(id=user.id, key=user.key, secret=user.secret, salt=salt)
 
+        return user, auth, salt
+
+    async def create_login(self, *, id: int) -> t.Tuple[UserData, AuthData]:
+        self.log.debug('security', f'Generating Credentials for Application (ID: {id}) ...')
+
+        user, auth, salt = self._generate(id)
+
         await self.store(id, salt, auth.token)
 
         return user, auth
 
+    async def create_logins(self, *, ids: t.Sequence[int]) -> t.List[t.Tuple[UserData, AuthData]]:
+        ''' Provisions credentials for every application in a single transaction '''
+
+        self.log.debug('security', f'Generating Credentials for {len(ids)} Applications ...')
+
+        generated = [self._generate(id) for id in ids]
+
+        await self.store_many([(auth.id, salt, auth.token) for _, auth, salt in generated])
+
+        return [(user, auth) for user, auth, _ in generated]
+
+    async def rotate_logins(self, *, ids: t.Sequence[int], overlap: timedelta = None) -> t.List[t.Tuple[UserData, AuthData]]:
+        '''
+            Issues new credentials, keeping the current ones valid for the overlap window
+
+            - Only applications with stored credentials are rotated (unknown ids are omitted from the result)
+            - The previous credentials keep verifying (and connecting) during the overlap
+        '''
+
+        overlap = self.overlap if overlap is None else overlap
+        self.log.debug('security', f'Rotating Credentials for {len(ids)} Applications (Overlap: {overlap}) ...')
+
+        generated = [self._generate(id) for id in ids]
+
+        rotated = await self.replace_many([(auth.id, salt, auth.token) for _, auth, salt in generated], overlap=overlap)
+
+        if len(rotated) != len(generated):
+            missing = [auth.id for _, auth, _ in generated if auth.id not in rotated]
+            self.log.warn('security', f'Skipped {len(missing)} Applications without Credentials (IDs: {missing})')
+
+        return [(user, auth) for user, auth, _ in generated if auth.id in rotated]
+
+    async def rotate_login(self, *, id: int, overlap: timedelta = None) -> t.Optional[t.Tuple[UserData, AuthData]]:
+        rotated = await self.rotate_logins(ids=[id], overlap=overlap)
+
+        return rotated[0] if rotated else None
+
+    @staticmethod
+    def _overlapping(record: asyncpg.Record) -> bool:
+        expires = record.get('Previous Expires')
+
+        return expires is not None and record['Previous Value'] is not None and expires > datetime.now(timezone.utc)
+
     async def verify(self, *, id: int, key: str, secret: str) -> AuthData:
         self.log.debug('security', f'Attempting to Authenticate Request (ID: {id}) ...')
-        _, protocol, hash = await self.retrieve(id=id).values()
+
+        # Secrets are issued as "<primary>.<secondary>", anything else can never match
+        record = await self.retrieve(id=id) if secret.count('.') == 1 else None
 
         auth = AuthData()
         auth.id = id
-        auth.token = self._build(id=id, key=key, secret=secret, salt=protocol)
 
-        if self._digest(auth.token) == hash:
-            auth.status = True
+        if record is not None:
+            auth.token = self._build(id=id, key=key, secret=secret, salt=record['Protocol'])
+            auth.status = secrets.compare_digest(self._digest(auth.token), record['Value'])
+
+        if record is not None and not auth.status and self._overlapping(record):
+            auth.token = self._build(id=id, key=key, secret=secret, salt=record['Previous Protocol'])
+            auth.status = secrets.compare_digest(self._digest(auth.token), record['Previous Value'])
+
+        if auth.status:
             self.log.trace('security', f'Successfully Authenticated Request (ID: {id})')
         else:
-            auth.status = False
-            self.log.warning('security', f'Failed to Authenticate Request (ID: {id})')
+            auth.token = None
+            self.log.warn('security', f'Failed to Authenticate Request (ID: {id})')
 
         return auth
@@ -0,0 +1,138 @@
+'''
+
+Response Serialization
+
+Replaces Quart's stock JSON provider with orjson (when installed, falling back to the standard library)
+and provides a helper to stream large result sets as a chunked JSON array straight from an asyncpg cursor,
+so leaderboards, infraction histories and statistics series are never built as one large string.
+
+Supported Types:
+    - Standard JSON Types (dict keys are converted to strings)
+    - asyncpg.Record            Serialized as an Object
+    - datetime/date/time        ISO 8601
+    - Decimal                   Serialized as a String
+    - dataclasses & NumPy       Scalars and Arrays
+
+'''
+
+
+import asyncpg
+import dataclasses
+
+import typing as t
+
+from decimal import Decimal
+from datetime import date
+from datetime import time
+from quart import g
+from quart import Quart
+from quart import Response
+from quart import current_app
+from quart.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: t.Any) -> t.Any:
+    if isinstance(obj, asyncpg.Record):
+        return dict(obj)
+
+    if isinstance(obj, (date, time)):
+        return obj.isoformat()
+
+    if isinstance(obj, Decimal):
+        return str(obj)
+
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    ''' orjson-backed JSON Provider with a Standard Library Fallback '''
+
+    sort_keys: bool = False
+    ensure_ascii: bool = False
+    default = staticmethod(_default)
+
+    options: int = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+    def encode(self, obj: t.Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=self.options)
+
+        return super().dumps(obj, separators=(',', ':')).encode('UTF-8')
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        if orjson is not None and not kwargs:
+            return self.encode(obj).decode('UTF-8')
+
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: t.Union[str, bytes], **kwargs: t.Any) -> t.Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: t.Any, **kwargs: t.Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
+
+    @classmethod
+    def register(cls, app: Quart) -> None:
+        app.json = cls(app)
+
+
+class Streamed():
+    ''' Chunked JSON Array Responses '''
+
+    @staticmethod
+    async def _chunks(db: asyncpg.Connection, query: str, args: tuple, *, size: int, encode: t.Callable, close: bool) -> t.AsyncIterator[bytes]:
+        prefix = b'['
+
+        try:
+            async with db.transaction():
+                chunk = []
+                async for record in db.cursor(query, *args, prefetch=size):
+                    chunk.append(encode(record))
+
+                    if len(chunk) >= size:
+                        yield prefix + b','.join(chunk)
+                        prefix, chunk = b',', []
+
+                if chunk:
+                    yield prefix + b','.join(chunk)
+                    prefix = b','
+        finally:
+            if close:
+                await db.close()
+
+        yield b'[]' if prefix == b'[' else b']'
+
+    @classmethod
+    def response(cls, db: asyncpg.Connection, query: str, *args, size: int = 500) -> Response:
+        '''
+            Streams the query results as a JSON Array
+
+            - Records are fetched using a server-side cursor (`size` rows per round-trip)
+            - Each batch of rows is encoded and sent as a single chunk
+            - Connections opened by `Decorators.connected` are closed once the stream completes
+        '''
+
+        close = g.pop('database', None) is db
+
+        provider = current_app.json
+        encode = provider.encode if isinstance(provider, FastJSONProvider) else lambda obj: provider.dumps(obj).encode('UTF-8')
+
+        chunks = cls._chunks(db, query, args, size=size, encode=lambda record: encode(dict(record)), close=close)
+
+        return current_app.response_class(chunks, mimetype='application/json')
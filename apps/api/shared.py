@@ -0,0 +1,23 @@
+'''
+
+Shared Packages
+
+Packages shared by the API and the bot (ex. "apps/logger") live in the "apps/" directory.
+Importing this module makes them importable from the API's root (ex. `from logger import getLogger`).
+
+Important Notes:
+    Entry points (`main`, `loadtest`) must import this module before anything else
+
+'''
+
+
+import sys
+
+from os.path import abspath
+from os.path import dirname
+
+
+root = dirname(dirname(abspath(__file__)))
+
+if root not in sys.path:
+    sys.path.append(root)
@@ -0,0 +1,9 @@
+import sys
+
+from pathlib import Path
+
+
+# Modules of the API are imported from its root (ex. `from utils import Decorators`)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import shared
@@ -0,0 +1,128 @@
+'''
+
+Log Collector Delivery
+
+Runs a collector on a temporary socket (in a thread) and checks that client records are delivered
+in order, buffered while it is unreachable, and replayed once it is reachable again.
+
+'''
+
+
+import os
+import sys
+import socket
+import threading
+import subprocess
+
+import pytest
+import typing as t
+
+from logger.records import read
+from logger.records import Record
+from logger.collector import _fit
+from logger.collector import LogCollector
+from logger.collector import CollectorClient
+from logger.collector import max_datagram
+
+
+@pytest.fixture
+def directory(tmp_path) -> str:
+    return f'{tmp_path}/'
+
+
+def _serve(directory: str) -> t.Tuple[LogCollector, threading.Thread]:
+    collector = LogCollector(directory + 'collector.sock', dir=directory)
+
+    thread = threading.Thread(target=collector.serve_forever, daemon=True)
+    thread.start()
+
+    return collector, thread
+
+
+def _stop(collector: LogCollector, thread: threading.Thread) -> None:
+    collector._closed.set()
+    thread.join()
+
+
+def _messages(directory: str) -> list:
+    return [record.message for record in read(directory + 'events.log', 'text')]
+
+
+def test_fit_truncates_oversized_records():
+    payload = Record.now(2, 'security', 'x' * 300000).pack()
+
+    fitted = _fit(payload, max_datagram)
+    record = Record.unpack(fitted)
+
+    assert len(fitted) <= max_datagram
+    assert record.locale == 'security'
+    assert record.message.endswith('Bytes]')
+
+    assert _fit(b'small', max_datagram) == b'small'
+
+
+def test_burst_is_delivered_in_order(directory):
+    collector, thread = _serve(directory)
+    client = CollectorClient(directory + 'collector.sock', dir=directory)
+
+    for index in range(500):
+        client.send(Record.now(0, 'burst', str(index)))
+
+    client.send(Record.now(0, 'burst', 'x' * 300000))
+
+    _stop(collector, thread)
+
+    messages = _messages(directory)
+
+    assert messages[:500] == [str(index) for index in range(500)]
+    assert len(messages) == 501
+    assert not os.path.exists(client.pending)
+
+
+def test_records_are_buffered_and_replayed(directory):
+    client = CollectorClient(directory + 'collector.sock', dir=directory, retry=0)
+
+    for index in range(20):
+        client.send(Record.now(0, 'outage', str(index)))
+
+    assert os.path.exists(client.pending)
+
+    collector, thread = _serve(directory)
+    client.send(Record.now(0, 'outage', 'recovered'))
+    _stop(collector, thread)
+
+    assert _messages(directory) == [str(index) for index in range(20)] + ['recovered']
+    assert not os.path.exists(client.pending)
+
+
+def test_orphaned_buffers_are_adopted(directory):
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+    orphan = f'{directory}pending-{exited.stdout.strip()}.log'
+
+    with open(orphan, 'wb') as pending:
+        pending.write(Record.now(2, 'orphan', 'buffered').pack().hex().encode() + b'\n')
+
+    client = CollectorClient(directory + 'collector.sock', dir=directory, retry=0)
+    assert not os.path.exists(orphan)
+
+    collector, thread = _serve(directory)
+    client.send(Record.now(2, 'client', 'new'))
+    _stop(collector, thread)
+
+    assert _messages(directory) == ['buffered', 'new']
+
+
+def test_malformed_datagrams_are_dropped(directory):
+    collector, thread = _serve(directory)
+
+    sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sender.sendto(b'\x01', directory + 'collector.sock')
+    sender.sendto(b'\x09' + b'\x00' * 10, directory + 'collector.sock')
+    sender.close()
+
+    client = CollectorClient(directory + 'collector.sock', dir=directory)
+    client.send(Record.now(2, 'client', 'delivered'))
+    _stop(collector, thread)
+
+    assert _messages(directory) == ['delivered']
+    assert collector.counters['dropped'] == 2
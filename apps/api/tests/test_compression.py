@@ -0,0 +1,166 @@
+'''
+
+Negotiated Response Compression
+
+'''
+
+
+import gzip
+import asyncio
+
+import pytest
+
+import compression
+
+from compression import negotiate
+from compression import Compression
+
+
+body = b'{"value": "' + b'compressible ' * 200 + b'"}'
+
+
+def _app(*chunks: bytes, status: int = 200, headers: list = None, length: bool = True):
+    async def app(scope: dict, receive, send) -> None:
+        start = [(b'content-type', b'application/json'), *(headers or [])]
+        if length:
+            start.append((b'content-length', str(sum(map(len, chunks))).encode()))
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': start})
+        for index, chunk in enumerate(chunks):
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': index < len(chunks) - 1})
+
+        # Quart terminates bodies of a known length with an empty chunk
+        if length:
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    return app
+
+
+def _request(middleware: Compression, *, encoding: str = 'gzip', path: str = '/data', query: bytes = b'', method: str = 'GET'):
+    sent = []
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query,
+        'headers': [(b'accept-encoding', encoding.encode())]
+    }
+
+    asyncio.run(middleware(scope, None, send))
+
+    start = sent[0]
+    headers = dict((name.lower(), value) for name, value in start['headers'])
+    content = b''.join(message.get('body', b'') for message in sent[1:])
+
+    return start['status'], headers, content, sent[1:]
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('identity', None),
+    ('', None),
+    ('*', 'br'),
+    ('deflate, gzip;q=0.5', 'gzip'),
+    ('GZIP; q=0.8, br;q=0.9', 'br'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('*;q=0.1, gzip;q=0', 'br'),
+    ('gzip;q=bad', None)
+])
+def test_negotiate(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, 'brotli', object())
+
+    assert negotiate(header) == expected
+
+
+def test_negotiate_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+
+    assert negotiate('br') is None
+    assert negotiate('br, gzip;q=0.1') == 'gzip'
+
+
+def test_buffered_responses_are_compressed_once():
+    chunks = (body[:100], body[100:1000], body[1000:])
+    status, headers, content, messages = _request(Compression(_app(*chunks)))
+
+    assert status == 200
+    assert headers[b'content-encoding'] == b'gzip'
+    assert headers[b'vary'] == b'Accept-Encoding'
+    assert int(headers[b'content-length']) == len(content)
+    assert gzip.decompress(content) == body
+    assert len(messages) == 1 and not messages[0]['more_body']
+
+
+def test_streamed_responses_are_compressed_incrementally():
+    chunks = (body[:1000], body[1000:])
+    status, headers, content, messages = _request(Compression(_app(*chunks, length=False)))
+
+    assert b'content-length' not in headers
+    assert gzip.decompress(content) == body
+    assert [message['more_body'] for message in messages] == [True, False]
+
+
+@pytest.mark.parametrize('sent, encoding, status, headers', [
+    (b'{"small": true}', 'gzip', 200, []),
+    (body, 'identity', 200, []),
+    (body, 'gzip', 206, [(b'content-range', b'bytes 0-10/100')]),
+    (body, 'gzip', 200, [(b'content-encoding', b'br')])
+])
+def test_sent_as_is(sent, encoding, status, headers):
+    _, received, content, _ = _request(Compression(_app(sent, status=status, headers=headers)), encoding=encoding)
+
+    assert received.get(b'content-encoding') == dict(headers).get(b'content-encoding')
+    assert content == sent
+
+
+def test_uncompressed_responses_vary():
+    _, headers, _, _ = _request(Compression(_app(body)), encoding='identity')
+
+    assert headers[b'vary'] == b'Accept-Encoding'
+
+
+def test_existing_vary_is_kept():
+    _, headers, _, _ = _request(Compression(_app(body, headers=[(b'vary', b'Origin, Accept-Encoding')])))
+
+    assert headers[b'vary'] == b'Origin, Accept-Encoding'
+
+
+def test_cache_is_keyed_by_resource():
+    middleware = Compression(_app(body, headers=[(b'etag', b'"v1"')]))
+
+    _, headers, first, _ = _request(middleware, path='/a')
+    _request(middleware, path='/a')
+    _request(middleware, path='/a', query=b'page=2')
+    _request(middleware, path='/b')
+
+    assert headers[b'etag'] == b'W/"v1"'
+    assert gzip.decompress(first) == body
+    assert sorted(middleware.cache) == [
+        (b'/a?', b'"v1"', 'gzip'),
+        (b'/a?page=2', b'"v1"', 'gzip'),
+        (b'/b?', b'"v1"', 'gzip')
+    ]
+
+
+def test_cache_is_bounded():
+    middleware = Compression(_app(body, headers=[(b'etag', b'"v1"')]), cache=2)
+
+    for path in ('/a', '/b', '/c'):
+        _request(middleware, path=path)
+
+    assert [key[0] for key in middleware.cache] == [b'/b?', b'/c?']
+
+
+def test_responses_without_etag_are_not_cached():
+    middleware = Compression(_app(body))
+    _request(middleware)
+
+    assert not middleware.cache
+
+
+def test_head_requests_are_not_compressed():
+    _, headers, _, _ = _request(Compression(_app(body)), method='HEAD')
+
+    assert b'content-encoding' not in headers
@@ -0,0 +1,64 @@
+'''
+
+Import-Time Budget
+
+Every Hypercorn worker imports `main` on startup, so first-party modules must stay cheap to import.
+Optional and heavyweight dependencies are imported on first use, and must never be loaded by `import main`.
+
+Usage:
+    python -m pytest tests
+
+'''
+
+
+import sys
+import subprocess
+
+from pathlib import Path
+
+
+root = Path(__file__).resolve().parents[1]
+
+deferred = ('numpy', 'twilio', 'colorama', 'dotenv')
+
+first_party = ('main', 'shared', 'config', 'utils', 'security', 'exceptions', 'serialization', 'compression', 'logger', 'exts')
+
+budget = 0.05       # Seconds spent in first-party module bodies
+ceiling = 2.0       # Seconds for the whole `import main` (dependencies included)
+
+
+def _import(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd = root,
+        capture_output = True,
+        text = True,
+        check = True
+    )
+
+
+def test_deferred_dependencies():
+    result = _import(f'import sys, main; print(",".join(name for name in {deferred!r} if name in sys.modules))')
+
+    assert result.stdout.strip() == ''
+
+
+def test_import_budget():
+    result = _import('import main')
+
+    spent, total = 0, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        own, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+
+        if name.split('.')[0] in first_party:
+            spent += int(own)
+
+        if name == 'main':
+            total = int(cumulative)
+
+    assert spent / 1e6 < budget, f'First-party modules took {spent / 1e3:.1f}ms to import'
+    assert total / 1e6 < ceiling, f'import main took {total / 1e3:.1f}ms'
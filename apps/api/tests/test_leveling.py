@@ -0,0 +1,82 @@
+'''
+
+Level Curves & Role Rewards
+
+'''
+
+
+import pytest
+import numpy as np
+
+from exts.leveling import _curve
+from exts.leveling import _columns
+from exts.leveling import _rewards
+from exts.leveling import LevelCurve
+from exts.leveling import RoleRewards
+from exceptions import MissingRequestData
+
+
+def _required(level: int, a: int = 5, b: int = 50, c: int = 100) -> int:
+    return a * level ** 2 + b * level + c
+
+
+def test_level_thresholds():
+    curve = LevelCurve.get((5, 50, 100))
+    total = sum(_required(level) for level in range(10))
+
+    assert curve.level(0) == 0
+    assert curve.level(_required(0) - 1) == 0
+    assert curve.level(_required(0)) == 1
+    assert curve.level(total - 1) == 9
+    assert curve.level(total) == 10
+
+
+def test_levels_are_vectorized():
+    curve = LevelCurve.get((5, 50, 100))
+    xp = np.asarray([0, 99, 100, 255, 10 ** 6])
+
+    assert curve.levels(xp).tolist() == [curve.level(int(value)) for value in xp]
+
+
+def test_curves_are_cached():
+    assert LevelCurve.get((1, 2, 3)) is LevelCurve.get((1, 2, 3))
+
+
+def test_reward_diff():
+    rewards = RoleRewards({'5': 500, '10': 1000, '20': 2000})
+
+    users = np.asarray([1, 2, 3, 4])
+    before = np.asarray([0, 12, 7, 25])
+    after = np.asarray([11, 4, 8, 0])
+
+    assert rewards.diff(users, before, after) == {
+        1: {'granted': [500, 1000], 'revoked': []},
+        2: {'granted': [], 'revoked': [500, 1000]},
+        4: {'granted': [], 'revoked': [500, 1000, 2000]}
+    }
+
+
+def test_reward_diff_without_rewards():
+    assert RoleRewards().diff(np.asarray([1]), np.asarray([0]), np.asarray([50])) == {}
+
+
+@pytest.mark.parametrize('curve', ['abc', [1, 2], [1.5, 2, 3], [-1, 2, 3], [1, 2, 0], [True, 2, 3], [10 ** 12, 0, 1]])
+def test_invalid_curves(curve):
+    with pytest.raises(MissingRequestData):
+        _curve({'curve': curve})
+
+
+def test_default_curve():
+    assert _curve({}).coefficients == (5, 50, 100)
+
+
+@pytest.mark.parametrize('rewards', [[1, 2], {'five': 1}, {'5': 'role'}])
+def test_invalid_rewards(rewards):
+    with pytest.raises(MissingRequestData):
+        _rewards({'rewards': rewards})
+
+
+@pytest.mark.parametrize('data', [{}, {'users': [1, 2], 'xp': [1]}, {'users': [1, 1], 'xp': [1, 2]}, {'users': ['1'], 'xp': [1]}])
+def test_invalid_columns(data):
+    with pytest.raises(MissingRequestData):
+        _columns(data)
@@ -0,0 +1,93 @@
+'''
+
+Log Records, Codecs & Segments
+
+'''
+
+
+import io
+
+import pytest
+
+import logger
+
+from logger import getLogger
+from logger.records import read
+from logger.records import Record
+from logger.records import Segment
+from logger.records import codecs
+from logger.records import extensions
+
+
+records = [
+    Record(1623810161000, 0, 'security', 'Generating API Key ...'),
+    Record(1623810161250, 3, 'leveling', 'Updated 3 of 4 Members (Guild: 1)'),
+    Record(1623810162500, 5, 'security', 'Unicode — ✓'),
+    Record(1623810163000, 2, 'statistics', 'Downsampled minute --> hour')
+]
+
+
+@pytest.mark.parametrize('format', list(codecs))
+def test_codec_round_trip(format):
+    codec = codecs[format]()
+    stream = io.BytesIO(b''.join(codec.encode(record) for record in records))
+
+    assert list(codecs[format]().decode(stream)) == records
+
+
+def test_binary_locales_are_interned():
+    codec = codecs['binary']()
+
+    first = codec.encode(records[0])
+    repeated = codec.encode(records[0])
+
+    assert len(repeated) < len(first)
+
+    codec.reset()
+    assert codec.encode(records[0]) == first
+
+
+def test_datagram_round_trip():
+    for record in records:
+        assert Record.unpack(record.pack()) == record
+
+
+@pytest.mark.parametrize('format', list(codecs))
+def test_segment_header_and_records(tmp_path, format):
+    source = tmp_path / f'events{extensions[format]}'
+    codec = codecs[format]()
+    source.write_bytes(b''.join(codec.encode(record) for record in records))
+
+    segment = Segment.write(str(tmp_path / 'events'), source=str(source), format=format)
+    header = Segment.header(segment)
+
+    assert segment.endswith(f'events-{records[0].timestamp:013d}.seg')
+    assert header['format'] == format
+    assert header['first'] == records[0].timestamp
+    assert header['last'] == records[-1].timestamp
+    assert header['counts'] == [1, 0, 1, 1, 0, 1]
+
+    assert list(Segment.records(segment)) == records
+
+
+def test_segment_rejects_other_files(tmp_path):
+    path = tmp_path / 'events.log'
+    path.write_bytes(b'[INFO]')
+
+    with pytest.raises(ValueError):
+        Segment.header(str(path))
+
+
+def test_unsupported_formats_fall_back_to_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger, 'directory', f'{tmp_path}/')
+    monkeypatch.setattr(logger, 'warned', set())
+
+    for format in ['binary', 'yaml']:
+        log = getLogger('CRITICAL', format=format)
+        log.info('security', 'first')
+        log.info('leveling', 'second')
+
+    messages = [record.message for record in read(f'{tmp_path}/events.log', 'text')]
+
+    assert messages.count('first') == 2 and messages.count('second') == 2
+    assert len([message for message in messages if message.startswith('Unsupported Log Format')]) == 2
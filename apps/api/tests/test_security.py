@@ -0,0 +1,90 @@
+'''
+
+Credential Verification & Connected Routes
+
+'''
+
+
+import asyncio
+
+import pytest
+
+from utils import DataEngine
+from security import AuthData
+from security import Authentication
+
+
+class Connection():
+    def __init__(self, *, fails: bool = False):
+        self.fails = fails
+        self.statements = []
+        self.closed = False
+
+    async def execute(self, query: str) -> str:
+        self.statements.append(query)
+        if self.fails:
+            raise PermissionError(query)
+
+        return 'SET'
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class Silent():
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: None
+
+
+def _verify(secret: str, *, stored: str = 'primary.secondary'):
+    auth = Authentication(logger=Silent())
+    token = auth._build(id=7, key='key', secret=stored, salt='a.b-c=d')
+
+    async def retrieve(*, id: int) -> dict:
+        return {'Protocol': 'a.b-c=d', 'Value': auth._digest(token), 'Previous Value': None, 'Previous Expires': None}
+
+    auth.retrieve = retrieve
+
+    return asyncio.run(auth.verify(id=7, key='key', secret=secret))
+
+
+def test_valid_secret():
+    result = _verify('primary.secondary')
+
+    assert result.status
+    assert result.token == 'key.primary-7=secondary'
+
+
+@pytest.mark.parametrize('secret', ['', 'primary', 'primary.secondary.extra', 'primary.other'])
+def test_rejected_secrets(secret):
+    result = _verify(secret)
+
+    assert not result.status
+    assert result.token is None
+
+
+def test_connected_routes_assume_the_role(monkeypatch):
+    connection = Connection()
+
+    async def service(name: str) -> Connection:
+        return connection
+
+    monkeypatch.setattr(DataEngine, 'service', staticmethod(service))
+
+    assert asyncio.run(DataEngine.connect('Main', auth=AuthData(id=7, token='rotated'))) is connection
+    assert connection.statements == ['SET ROLE "7"']
+    assert not connection.closed
+
+
+def test_failed_role_switch_closes_the_connection(monkeypatch):
+    connection = Connection(fails=True)
+
+    async def service(name: str) -> Connection:
+        return connection
+
+    monkeypatch.setattr(DataEngine, 'service', staticmethod(service))
+
+    with pytest.raises(PermissionError):
+        asyncio.run(DataEngine.connect('Main', auth=AuthData(id=7)))
+
+    assert connection.closed
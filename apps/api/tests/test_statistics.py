@@ -0,0 +1,37 @@
+'''
+
+Statistics Query Planning
+
+'''
+
+
+import pytest
+
+from datetime import datetime
+from datetime import timezone
+from datetime import timedelta
+
+from exts.statistics import Rollups
+
+
+now = datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('age, granularity, expected', [
+    (timedelta(hours=1), 'minute', 'minute'),
+    (timedelta(hours=1), 'hour', 'hour'),
+    (timedelta(days=3), 'day', 'day'),
+    (timedelta(days=3), 'month', 'month'),
+    (timedelta(days=30), 'minute', 'hour'),
+    (timedelta(days=365), 'hour', 'day'),
+    (timedelta(days=10 * 365), 'day', 'month')
+])
+def test_plan(age, granularity, expected):
+    assert Rollups.plan(now - age, granularity, now=now).name == expected
+
+
+def test_query_sums_as_integers():
+    query, args = Rollups.query(1, 'messages', now - timedelta(hours=2), now, 'hour')
+
+    assert 'SUM("Value")::BIGINT AS "Value"' in query
+    assert args == (1, 'messages', now - timedelta(hours=2), now)
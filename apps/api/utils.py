@@ -1,11 +1,17 @@
+import math
+import asyncio
 import asyncpg
+import secrets
 import functools
 
 import typing as t
 
-from os import environ
+from quart import g
+from quart import Quart
 from quart import request
-from dotenv import load_dotenv
+
+from config import get_settings
+from logger.profiler import SamplingProfiler
 
 from security import AuthData
 from security import UserData
@@ -13,25 +19,43 @@ from security import Authentication
 
 from exceptions import MissingAuthentication
 from exceptions import InvalidAuthentication
-
-
-load_dotenv()
+from exceptions import MissingRequestData
 
 
 class DataEngine():
     ''' Database Utilities '''
 
-    host: str = environ.get('PSQL_HOST')
-    port: int = int(environ.get('PQSL_PORT'))
-
     @staticmethod
     async def connect(name: str, *, auth: AuthData) -> asyncpg.Connection:
+        '''
+            Connects using the API's service login, then assumes the verified application's role
+
+            The service login must be a member of every application role ("GRANT <id> TO <service>"),
+            so switching roles doesn't depend on the application's (rotating) credentials
+        '''
+
+        database = await DataEngine.service(name)
+
+        try:
+            await database.execute(f'SET ROLE "{int(auth.id)}"')
+        except BaseException:
+            await database.close()
+            raise
+
+        return database
+
+    @staticmethod
+    async def service(name: str) -> asyncpg.Connection:
+        ''' Connects using the API's own login (background tasks without a request client) '''
+
+        settings = get_settings()
+
         database = await asyncpg.connect(
-            host = DataEngine.host,
-            port = DataEngine.port,
+            host = settings.psql_host,
+            port = settings.psql_port,
 
-            user = auth.id,
-            password = auth.token,
+            user = settings.service_user,
+            password = settings.service_password,
             database = name
         )
 
@@ -62,10 +86,9 @@ class Decorators():
                 raise MissingAuthentication()
 
             try:
-                client_auth = request.headers['Authentication']
-                id = client_auth['client-id']
-                secret = client_auth['client-secret']
-            except KeyError:
+                id = int(request.headers['client-id'])
+                secret = request.headers['client-secret']
+            except (KeyError, ValueError):
                 raise MissingAuthentication()
 
             auth_data = await Authentication().verify(
@@ -91,10 +114,9 @@ class Decorators():
                     raise MissingAuthentication()
 
                 try:
-                    client_auth = request.headers['Authentication']
-                    id = client_auth['client-id']
-                    secret = client_auth['client-secret']
-                except KeyError:
+                    id = int(request.headers['client-id'])
+                    secret = request.headers['client-secret']
+                except (KeyError, ValueError):
                     raise MissingAuthentication()
 
                 auth_data = await Authentication().verify(
@@ -106,8 +128,81 @@ class Decorators():
                 if not auth_data.status:
                     raise InvalidAuthentication()
 
-                database = await DataEngine.connect(name, auth=auth_data)
+                database = g.database = await DataEngine.connect(name, auth=auth_data)
 
-                return await f(database, *args, **kwargs)
+                try:
+                    return await f(database, *args, **kwargs)
+                finally:
+                    # Streamed responses take ownership of the connection (see "serialization.py")
+                    if g.pop('database', None) is not None:
+                        await database.close()
             return wrapper
         return decorator
+
+
+class Profiling():
+    '''
+        On-Demand Sampling Profiler for Individual Requests
+
+        Enabled per request by supplying the admin key (env "PROFILER_KEY") using either
+            - Header    "X-Profile"             Profiles the current request
+            - URL       "profile"               Profiles the current request
+            - Header    "X-Profile-Window"      Profiles every request served during the next N seconds (capped)
+                                                A value of 0 stops the active window
+
+        Only one window runs per worker at a time, and profiles are written off the event loop.
+    '''
+
+    max_window: float = 300.0
+
+    window: SamplingProfiler = None
+
+    @staticmethod
+    def _authorized() -> bool:
+        key = get_settings().profiler_key
+        provided = request.headers.get('X-Profile') or request.args.get('profile')
+        if not key or not provided:
+            return False
+
+        return secrets.compare_digest(provided, key)
+
+    @classmethod
+    async def _begin(cls) -> None:
+        if not cls._authorized():
+            return
+
+        label = f'{request.method}{request.path}'.replace('/', '_')
+
+        try:
+            window = float(request.headers['X-Profile-Window'])
+        except (KeyError, ValueError):
+            g.profiler = SamplingProfiler(label).start()
+            return
+
+        if not math.isfinite(window):
+            return
+
+        active = cls.window is not None and cls.window.running
+
+        if window <= 0:
+            if active:
+                g.window = await asyncio.to_thread(cls.window.stop)
+        elif not active:
+            cls.window = SamplingProfiler(f'window{label}', duration=min(window, cls.max_window)).start()
+
+    @staticmethod
+    async def _finish(response):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            response.headers['X-Profile-Output'] = (await asyncio.to_thread(profiler.stop)).rsplit('/', 1)[-1]
+
+        window = g.pop('window', None)
+        if window is not None:
+            response.headers['X-Profile-Window-Output'] = window.rsplit('/', 1)[-1]
+
+        return response
+
+    @classmethod
+    def register(cls, app: Quart) -> None:
+        app.before_request(cls._begin)
+        app.after_request(cls._finish)
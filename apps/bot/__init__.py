@@ -9,3 +9,85 @@ Contains utility functions such as:
     ...
 
 '''
+
+
+import sys
+import math
+import asyncio
+
+import typing as t
+
+from os.path import abspath
+from os.path import dirname
+from discord.ext import commands
+
+# Packages shared with the API (ex. "apps/logger") live in the "apps/" directory
+root = dirname(dirname(abspath(__file__)))
+if root not in sys.path:
+    sys.path.append(root)
+
+from logger.profiler import SamplingProfiler
+
+from .cache import MemberCache
+
+
+class Bot(commands.Bot):
+    ''' A.V.A Discord Bot '''
+
+    max_window: float = 300.0
+
+    def __init__(self, *args, cache_budget: int = 64 * 1024 * 1024, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.members = MemberCache(budget=cache_budget)
+
+        self.profiled_events = set()
+        self.profiler = None
+
+    '''
+        Profiling
+    '''
+
+    def profile(self, event: str = None, *, window: float = None) -> None:
+        '''
+            Enables the Sampling Profiler
+
+            - Event Name    Profiles every dispatch of the event (ex. "on_message")
+            - Window        Profiles the entire event loop for N seconds (capped, only one window at a time)
+        '''
+
+        if event is not None:
+            self.profiled_events.add(event if event.startswith('on_') else f'on_{event}')
+
+        if window is None or not math.isfinite(window) or window <= 0:
+            return
+
+        if not (self.profiler and self.profiler.running):
+            self.profiler = SamplingProfiler('window', duration=min(window, self.max_window)).start()
+
+    async def unprofile(self, event: str = None) -> t.Optional[str]:
+        '''
+            Disables profiling for the event, or for all events and windows if none is provided
+
+            Returns the path of the stopped window's profile (written off the event loop)
+        '''
+
+        if event is not None:
+            self.profiled_events.discard(event if event.startswith('on_') else f'on_{event}')
+            return None
+
+        self.profiled_events.clear()
+        if self.profiler and self.profiler.running:
+            return await asyncio.to_thread(self.profiler.stop)
+
+        return None
+
+    async def _run_event(self, coro, event_name: str, *args, **kwargs) -> None:
+        if event_name not in self.profiled_events:
+            return await super()._run_event(coro, event_name, *args, **kwargs)
+
+        profiler = SamplingProfiler(event_name).start()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            await asyncio.to_thread(profiler.stop)
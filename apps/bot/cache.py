@@ -0,0 +1,170 @@
+'''
+
+Compact Per-Guild Member Cache
+
+Caches the member state required by Leveling, Infractions and Modmail using `__slots__` records
+(no per-instance `__dict__`), keyed by the member's integer ID.
+
+The footprint of a member covers the record and its field values (an active member with a
+large XP total and a recent message); mutes and modmail threads add a few dozen bytes each.
+
+Guilds are kept in least-recently-active order. Once the estimated footprint surpasses
+the memory budget, the least recently active guilds are evicted as a whole.
+
+Report Format:
+    {"guilds": 1204, "members": 381920, "bytes": 81409067, "bytes_per_member": 213.16, "evictions": 12}
+
+'''
+
+
+import sys
+
+import typing as t
+
+from collections import OrderedDict
+
+
+class MemberState():
+    ''' Cached State for a Single Guild Member '''
+
+    __slots__ = ('id', 'xp', 'level', 'last_message', 'infractions', 'muted_until', 'thread')
+
+    def __init__(self, id: int):
+        self.id = id
+
+        self.xp = 0
+        self.level = 0
+        self.last_message = 0.0
+
+        self.infractions = 0
+        self.muted_until = None
+
+        self.thread = None
+
+    def __repr__(self) -> str:
+        return f'<MemberState id={self.id} xp={self.xp} level={self.level}>'
+
+    def sizeof(self) -> int:
+        ''' Bytes held by the record and its field values (interned small integers and `None` are shared) '''
+
+        size = sys.getsizeof(self)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is None or (isinstance(value, int) and -5 <= value <= 256):
+                continue
+
+            size += sys.getsizeof(value)
+
+        return size
+
+    @classmethod
+    def typical(cls) -> 'MemberState':
+        ''' A representative active member (large ID & XP, recent message, no mute or thread) '''
+
+        state = cls(2 ** 62)
+        state.xp = 10 ** 6
+        state.level = 50
+        state.last_message = 1.7e9
+
+        return state
+
+
+class GuildState():
+    ''' Cached Members of a Single Guild '''
+
+    __slots__ = ('id', 'members')
+
+    def __init__(self, id: int):
+        self.id = id
+        self.members = {}
+
+    @property
+    def footprint(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.members) + len(self.members) * MemberCache.member_bytes
+
+
+class MemberCache():
+    ''' Least-Recently-Active Guild Cache with a Memory Budget '''
+
+    # Per-member estimate; the members dict's own table is measured separately by `GuildState.footprint`
+    member_bytes: int = MemberState.typical().sizeof()
+
+    def __init__(self, *, budget: int = 64 * 1024 * 1024):
+        self.budget = budget
+        self.guilds = OrderedDict()
+
+        self.bytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return sum(len(guild.members) for guild in self.guilds.values())
+
+    '''
+        Lookups
+    '''
+
+    def guild(self, id: int) -> GuildState:
+        guild = self.guilds.get(id)
+        if guild is None:
+            guild = self.guilds[id] = GuildState(id)
+            self.bytes += guild.footprint
+        else:
+            self.guilds.move_to_end(id)
+
+        return guild
+
+    def get(self, guild: int, member: int) -> t.Optional[MemberState]:
+        cached = self.guilds.get(guild)
+        if cached is None:
+            return None
+
+        self.guilds.move_to_end(guild)
+
+        return cached.members.get(member)
+
+    def member(self, guild: int, member: int) -> MemberState:
+        ''' Returns the cached member, creating it if necessary '''
+
+        cached = self.guild(guild)
+
+        state = cached.members.get(member)
+        if state is None:
+            before = cached.footprint
+            state = cached.members[member] = MemberState(member)
+
+            self.bytes += cached.footprint - before
+            self._evict()
+
+        return state
+
+    '''
+        Eviction
+    '''
+
+    def discard(self, guild: int, member: int = None) -> None:
+        cached = self.guilds.get(guild)
+        if cached is None:
+            return
+
+        before = cached.footprint
+        if member is None:
+            del self.guilds[guild]
+            self.bytes -= before
+        elif cached.members.pop(member, None) is not None:
+            self.bytes -= before - cached.footprint
+
+    def _evict(self) -> None:
+        while self.bytes > self.budget and len(self.guilds) > 1:
+            self.discard(next(iter(self.guilds)))
+            self.evictions += 1
+
+    def report(self) -> dict:
+        members = len(self)
+
+        return {
+            'guilds': len(self.guilds),
+            'members': members,
+            'bytes': self.bytes,
+            'bytes_per_member': round(self.bytes / members, 2) if members else 0.0,
+            'evictions': self.evictions
+        }
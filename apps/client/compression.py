@@ -0,0 +1,64 @@
+'''
+
+Response Decompression
+
+Advertises the encodings supported by this client (brotli when installed, gzip otherwise)
+and decodes compressed API responses, including streamed responses decoded chunk-by-chunk.
+
+Usage:
+    headers = {**credentials, 'Accept-Encoding': accept_encoding}
+    data = decode(body, response.headers.get('Content-Encoding'))
+
+'''
+
+
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+accept_encoding = ', '.join(encodings)
+
+
+class Decoder():
+    ''' Incremental Decoder for a Single Response '''
+
+    def __init__(self, encoding: str = None):
+        self.encoding = (encoding or 'identity').strip().lower()
+
+        if self.encoding == 'br':
+            if brotli is None:
+                raise ValueError('Received a brotli-encoded response, but brotli is not installed')
+
+            self._decoder = brotli.Decompressor()
+        elif self.encoding in ('gzip', 'x-gzip'):
+            self._decoder = zlib.decompressobj(47)
+        elif self.encoding == 'identity':
+            self._decoder = None
+        else:
+            raise ValueError(f'Unsupported Content-Encoding: {encoding}')
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self._decoder is None:
+            return chunk
+
+        if self.encoding == 'br':
+            return self._decoder.process(chunk)
+
+        return self._decoder.decompress(chunk)
+
+    def finish(self) -> bytes:
+        if self._decoder is None or self.encoding == 'br':
+            return b''
+
+        return self._decoder.flush()
+
+
+def decode(body: bytes, encoding: str = None) -> bytes:
+    decoder = Decoder(encoding)
+
+    return decoder.feed(body) + decoder.finish()
@@ -0,0 +1,333 @@
+'''
+
+Creates a Custom Logging Object with 5 tiers
+
+    0       CYAN        TRACE       Step-By-Step Operation Processing Logging
+    1       GREEN       DEBUG       Operations Logging
+    2       BLUE        INFO        Process Logging
+    3       MAGENTA     WARNING     Operation Processing Failure
+    4       YELLOW      ERROR       Total Operation Failure
+    5       RED         CRITICAL    Total Process Failure
+
+Format:
+    [LEVEL] MM-DD-YYYY HH:MM:SS.SSS (LOCATION) --> "ERROR MESSAGE"
+
+    Structured output ("json" or "binary", see "logger/records.py") can be selected
+    using the "LOG_FORMAT" setting or the `format` argument of `getLogger`
+    The binary format requires a collector (interned locales need a single writer per file)
+    Unknown formats (or binary without a collector) fall back to text, with a single warning per process
+
+Important Notes:
+    Shared by the API and the bot ("apps/logger"), both record their events in the same directory
+    All events should be recorded in "logger/data/events.log"
+    When a collector socket is configured ("LOG_COLLECTOR"), records are written by the collector process (see "logger/collector.py")
+    Settings are read on the first write (loggers are created at import time, before any ".env" is loaded)
+    If the level index surpasses the logging threshold it should be output to the console
+    All errors (level 3+) should be recorded in "logger/data/errors.log"
+    Critical Errors should trigger a Developer Notification (via Email/SMS)
+
+Bonus Feature:
+    Statistic Recall
+        - Pull statistics for a specified time period
+
+        Format:
+            Since MM/DD/YYYY, there have been -->
+                - 14,287 Steps Taken
+                - 394 Operations
+                - 76 Processes
+                - 92 Warnings
+                - 28 Errors
+                - 11 Critical Failures
+
+'''
+
+
+import functools
+
+import typing as t
+
+from os import getenv
+from glob import glob
+from os.path import abspath
+from datetime import datetime
+from datetime import timedelta
+
+from .records import read
+from .records import Record
+from .records import Segment
+from .records import TextCodec
+from .records import codecs
+from .records import extensions
+from .collector import CollectorClient
+
+
+directory = abspath(__file__).replace('__init__.py', 'data/')
+
+warned = set()
+
+
+levels = {
+    'TRACE': 0,
+    'DEBUG': 1,
+    'INFO': 2,
+    'WARNING': 3,
+    'ERROR': 4,
+    'CRITICAL': 5
+}
+
+names = {
+    'TRACE': 'Steps Taken',
+    'DEBUG': 'Operations',
+    'INFO': 'Processes',
+    'WARNING': 'Warnings',
+    'ERROR': 'Errors',
+    'CRITICAL': 'Critical Failures'
+}
+
+parser_config = {
+    's': 1,
+    'm': 60,
+    'h': 3600,
+    'd': 86400
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _colors() -> tuple:
+    ''' Imports and initializes Colorama on the first console output '''
+
+    from colorama import init
+    from colorama import Fore
+    from colorama import Style
+
+    init()
+
+    return Fore, Style
+
+
+@functools.lru_cache(maxsize=None)
+def _settings() -> tuple:
+    ''' Reads the collector socket & record format from the application settings (or the environment) '''
+
+    try:
+        from config import get_settings
+    except ImportError:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+
+        return getenv('LOG_COLLECTOR'), getenv('LOG_FORMAT', 'text')
+
+    settings = get_settings()
+
+    return settings.log_collector, settings.log_format
+
+
+def _format(format: str, collector: str = None) -> t.Tuple[str, t.Optional[str]]:
+    ''' Returns the format to write, along with the reason it was replaced by text (if it was) '''
+
+    if format not in codecs:
+        return 'text', 'Unknown Format'
+
+    if format == 'binary' and not collector:
+        return 'text', 'Binary Files Require a Collector'
+
+    return format, None
+
+
+@functools.lru_cache(maxsize=None)
+def _sms() -> tuple:
+    ''' Loads the Twilio client and SMS configuration on the first notification '''
+
+    from dotenv import load_dotenv
+    from twilio.rest import Client
+
+    load_dotenv()
+
+    client = Client(getenv('TWILIO_SID'), getenv('TWILIO_KEY'))
+
+    return client, getenv('SMS_RECEIVING'), getenv('SMS_SENDING')
+
+
+class StatEngine():
+    ''' Timelapse Statistical Analyzation of Recorded Events '''
+
+    @staticmethod
+    def get_timestamp(duration: str) -> datetime:
+        seconds = 0
+        increments = duration.split()
+
+        for increment in increments:
+            seconds += int(increment[:-1]) * parser_config[increment[-1].lower()]
+
+        delta = timedelta(seconds=seconds)
+        now = datetime.now()
+
+        return now - delta
+
+    @staticmethod
+    def sort_events(counts: list) -> dict:
+        return { names[key] : counts[index] for key, index in levels.items() }
+
+    @staticmethod
+    def _count(counts: list, records: iter, since: int) -> None:
+        for record in records:
+            if record.timestamp >= since:
+                counts[record.level] += 1
+
+    @classmethod
+    def retrieve_events(cls, timestamp: datetime, *, format: str = None) -> dict:
+        if format is None:
+            collector, format = _settings()
+            format, _ = _format(format, collector)
+
+        since = int(timestamp.timestamp() * 1000)
+        counts = [0] * len(levels)
+
+        for segment in glob(directory + 'events-*.seg'):
+            header = Segment.header(segment)
+            if header['last'] is None or header['last'] < since:
+                continue
+
+            if header['first'] >= since:
+                counts = [total + count for total, count in zip(counts, header['counts'])]
+            else:
+                cls._count(counts, Segment.records(segment), since)
+
+        cls._count(counts, read(directory + 'events' + extensions[format], format), since)
+
+        return cls.sort_events(counts)
+
+    @classmethod
+    def send_report(cls, duration: str) -> None:
+        earliest = cls.get_timestamp(duration)
+        statistics = cls.retrieve_events(earliest)
+
+        report = f'In the past {duration}, there have been: \n\t- '
+        report += '\n\t- '.join([f'{value} {key}' for key, value in statistics.items()])
+
+        client, to, from_ = _sms()
+
+        client.messages.create(
+            to = to,
+            from_ = from_,
+            body = report
+        )
+
+        return
+
+
+class LoggerModule():
+    ''' Customized Console Output and Filesystem Recording '''
+
+    def __init__(self, level: int, *, collector: str = None, format: str = None):
+        ''' Sets Logger Config (Colored Output and Destinations are initialized on first use) '''
+
+        self.level = level
+        self.options = (collector, format)
+
+        self.collector = None
+        self.logs = None
+        self.codecs = None
+
+    def _configure(self) -> None:
+        ''' Resolves the collector socket & record format (arguments take precedence over the settings) '''
+
+        collector, format = self.options
+        default_collector, default_format = _settings()
+
+        collector = collector or default_collector
+        configured = format or default_format
+        format, reason = _format(configured, collector)
+
+        self.collector = CollectorClient(collector) if collector else None
+
+        self.logs = { key: directory + key + extensions[format] for key in ['events', 'errors'] }
+        self.codecs = { key: codecs[format]() for key in self.logs }
+
+        if reason is not None and (configured, reason) not in warned:
+            warned.add((configured, reason))
+            self.warn('logger', f'Unsupported Log Format "{configured}" ({reason}), Falling Back to Text')
+
+    def _append(self, key: str, record: Record) -> None:
+        with open(self.logs[key], 'ab') as log:
+            log.write(self.codecs[key].encode(record))
+
+    def _write(self, record: Record) -> None:
+        if self.logs is None:
+            self._configure()
+
+        if self.collector is not None:
+            return self.collector.send(record)
+
+        self._append('events', record)
+        if record.level >= 3:
+            self._append('errors', record)
+
+    def _output(self, record: Record, *, color: str) -> None:
+        if record.level >= self.level:
+            Fore, Style = _colors()
+            print(f"{getattr(Fore, color)}" + TextCodec.start(record.level) + f"{Style.RESET_ALL}{record.stamp}\t({record.locale})\t{record.message}")
+
+    def _notify(self, *, message: str) -> None:
+        '''
+        report = (
+            'Oh No! A Critical Failure has been detected in my API! \n'
+            f'Here are the notes from my error handler: \n\n{message}'
+        )
+        '''
+
+        report = message
+
+
+        client, to, from_ = _sms()
+
+        client.messages.create(
+            to = to,
+            from_ = from_,
+            body = report
+        )
+
+        return
+
+    def _log(self, level: int, locale: str, message: str, *, color: str) -> Record:
+        record = Record.now(level, locale, message)
+
+        self._write(record)
+        self._output(record, color=color)
+
+        return record
+
+    def trace(self, locale: str, message: str) -> None:
+        self._log(0, locale, message, color='CYAN')
+
+    def debug(self, locale: str, message: str) -> None:
+        self._log(1, locale, message, color='GREEN')
+
+    def info(self, locale: str, message: str) -> None:
+        self._log(2, locale, message, color='BLUE')
+
+    def warn(self, locale: str, message: str) -> None:
+        self._log(3, locale, message, color='MAGENTA')
+
+    def error(self, locale: str, message: str) -> None:
+        self._log(4, locale, message, color='YELLOW')
+
+    def critical(self, locale: str, message: str) -> None:
+        record = self._log(5, locale, message, color='RED')
+
+        notification = (
+            f'[CRITICAL] \nLocation: {locale} \n'
+            f'Occurred At: {record.stamp} \n'
+            f'Error Details: {message}'
+        )
+
+        self._notify(message=notification)
+
+def getLogger(level: str = 'TRACE', *, collector: str = None, format: str = None) -> LoggerModule:
+    try:
+        log_level = levels[level]
+    except KeyError:
+        log_level = levels['TRACE']
+
+    return LoggerModule(log_level, collector=collector, format=format)
@@ -0,0 +1,371 @@
+'''
+
+Central Log Collector
+
+A single collector process owns the log files for every API worker and bot shard.
+Processes submit records as Unix datagrams (one record per datagram, so lines can never interleave)
+and the collector serializes writes, rotates files and keeps the level counters.
+
+Record Format (see "logger/records.py"):
+    1 byte      Level Index (0 - 5)
+    8 bytes     Timestamp (Epoch Milliseconds)
+    2 bytes     Locale Length
+    N bytes     Locale (UTF-8)
+    N bytes     Message (UTF-8)
+
+Important Notes:
+    If the collector is unreachable, records are buffered in "logger/data/pending-<PID>.log"
+    Buffered records are replayed (in order) as soon as the collector is reachable again
+    A full collector queue only delays a send (briefly blocking and retrying), it is not treated as an outage
+    Buffers left behind by exited processes are adopted (and replayed) by the next client to start
+    Records larger than a datagram (64 KiB) are truncated, malformed datagrams are dropped by the collector
+    Level counters are persisted in "logger/data/counters.json"
+    Rotated files are compressed into indexed segments ("events-<first timestamp>.seg")
+
+Usage (from the "apps/" directory):
+    python -m logger.collector [--socket PATH] [--format text|json|binary] [--max-bytes BYTES] [--backups COUNT]
+
+'''
+
+
+import os
+import json
+import time
+import errno
+import struct
+import signal
+import socket
+import argparse
+import threading
+
+from glob import glob
+from os.path import abspath
+from os.path import exists
+from collections import Counter
+
+from .records import read
+from .records import Record
+from .records import Segment
+from .records import codecs
+from .records import extensions
+
+
+directory = abspath(__file__).replace('collector.py', 'data/')
+default_socket = directory + 'collector.sock'
+
+max_datagram = 65536
+
+
+def _fit(payload: bytes, limit: int) -> bytes:
+    ''' Truncates the message of a packed record so the datagram is at most `limit` bytes '''
+
+    if len(payload) <= limit:
+        return payload
+
+    record = Record.unpack(payload)
+    marker = f' [Truncated {len(payload) - limit} Bytes]'.encode('UTF-8')
+
+    body = record.pack()[:limit - len(marker)]
+    record = Record.unpack(body)
+    record.message += marker.decode('UTF-8')
+
+    return record.pack()[:limit]
+
+
+class LogCollector():
+    ''' Single Owner of Log Files, Rotation and Counters '''
+
+    def __init__(self, path: str = default_socket, *, dir: str = directory, format: str = 'text', max_bytes: int = 8 * 1024 * 1024, backups: int = 5):
+        self.path = path
+        self.dir = dir
+        self.format = format
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+        self.logs = { key: dir + key + extensions[format] for key in ['events', 'errors'] }
+        self.files = { key: open(log, 'ab') for key, log in self.logs.items() }
+        self.codecs = { key: codecs[format]() for key in self.logs }
+        self.indexes = { key: Segment.index(self._existing(key)) for key in self.logs }
+
+        self.counters = Counter(self._load_counters())
+        self._closed = threading.Event()
+
+        if exists(path):
+            os.unlink(path)
+
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(path)
+        self.socket.settimeout(1.0)
+
+    '''
+        Counters
+    '''
+
+    def _load_counters(self) -> dict:
+        try:
+            with open(self.dir + 'counters.json', 'r') as counters:
+                return json.load(counters)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_counters(self) -> None:
+        with open(self.dir + 'counters.json', 'w+') as counters:
+            json.dump(dict(self.counters), counters)
+
+    '''
+        Filesystem
+    '''
+
+    def _existing(self, key: str) -> iter:
+        try:
+            yield from read(self.logs[key], self.format)
+        except (OSError, ValueError, IndexError):
+            return
+
+    def _rotate(self, key: str) -> None:
+        self.files[key].close()
+
+        path = self.logs[key]
+        Segment.write(self.dir + key, source=path, format=self.format, header=self.indexes[key])
+        os.unlink(path)
+
+        for expired in sorted(glob(f'{self.dir}{key}-*.seg'))[:-self.backups or None]:
+            os.unlink(expired)
+
+        self.files[key] = open(path, 'ab')
+        self.codecs[key] = codecs[self.format]()
+        self.indexes[key] = Segment.index([])
+
+    def _append(self, key: str, record: Record) -> None:
+        log = self.files[key]
+        log.write(self.codecs[key].encode(record))
+        log.flush()
+
+        index = self.indexes[key]
+        index['first'] = index['first'] or record.timestamp
+        index['last'] = record.timestamp
+        index['counts'][record.level] += 1
+
+        if log.tell() >= self.max_bytes:
+            self._rotate(key)
+
+    def handle(self, payload: bytes) -> None:
+        record = Record.unpack(payload)
+        if not 0 <= record.level <= 5:
+            raise ValueError(f'Invalid Level Index: {record.level}')
+
+        self._append('events', record)
+        if record.level >= 3:
+            self._append('errors', record)
+
+        self.counters[str(record.level)] += 1
+
+    '''
+        Controls
+    '''
+
+    def _receive(self) -> None:
+        try:
+            self.handle(self.socket.recv(max_datagram))
+        except (struct.error, ValueError):
+            self.counters['dropped'] += 1
+
+    def serve_forever(self, *, persist: float = 30.0) -> None:
+        saved = time.monotonic()
+
+        try:
+            while not self._closed.is_set():
+                try:
+                    self._receive()
+                except socket.timeout:
+                    pass
+
+                if time.monotonic() - saved >= persist:
+                    self._save_counters()
+                    saved = time.monotonic()
+
+            # Records already queued on the socket are written before shutting down
+            self.socket.setblocking(False)
+            while True:
+                try:
+                    self._receive()
+                except BlockingIOError:
+                    break
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._closed.set()
+        self.socket.close()
+
+        if exists(self.path):
+            os.unlink(self.path)
+
+        for log in self.files.values():
+            log.close()
+
+        self._save_counters()
+
+
+class CollectorClient():
+    ''' Submits Records to the Collector, Buffering Locally while it is Unreachable '''
+
+    def __init__(self, path: str = default_socket, *, dir: str = directory, retry: float = 5.0, timeout: float = 0.05, attempts: int = 5):
+        self.path = path
+        self.retry = retry
+        self.timeout = timeout
+        self.attempts = attempts
+        self.pending = f'{dir}pending-{os.getpid()}.log'
+
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.settimeout(timeout)
+
+        self._offset = 0
+
+        self._lock = threading.Lock()
+        self._adopt(dir)
+        self._down_since = float('-inf') if exists(self.pending) else None
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+
+        return True
+
+    def _adopt(self, dir: str) -> None:
+        ''' Takes over the buffers of exited processes (older records are replayed first) '''
+
+        adopted = []
+        for orphan in sorted(glob(f'{dir}pending-*.log'), key=os.path.getmtime):
+            pid = orphan[len(dir) + len('pending-'):-len('.log')]
+            if not pid.isdigit() or int(pid) == os.getpid() or self._alive(int(pid)):
+                continue
+
+            claimed = f'{orphan}.{os.getpid()}'
+            try:
+                os.rename(orphan, claimed)
+            except OSError:
+                continue
+
+            with open(claimed, 'rb') as pending:
+                adopted.append(pending.read())
+
+            os.unlink(claimed)
+
+        if not adopted:
+            return
+
+        if exists(self.pending):
+            with open(self.pending, 'rb') as pending:
+                adopted.append(pending.read())
+
+        with open(self.pending, 'wb') as pending:
+            pending.writelines(adopted)
+
+    def _submit(self, payload: bytes) -> bool:
+        '''
+            Sends a single datagram, returning False if the collector is unreachable
+
+            - Full receive queue    Sends block briefly (`timeout`) and are retried with a backoff
+            - Oversized datagram    The record is shrunk until it fits the socket's send buffer
+        '''
+
+        payload = _fit(payload, max_datagram)
+
+        for attempt in range(self.attempts):
+            try:
+                self.socket.sendto(payload, self.path)
+            except (socket.timeout, BlockingIOError):
+                continue
+            except OSError as error:
+                if error.errno in (errno.ECONNREFUSED, errno.ENOENT):
+                    return False
+
+                if error.errno == errno.ENOBUFS:
+                    time.sleep(self.timeout * 2 ** attempt)
+                    continue
+
+                if error.errno != errno.EMSGSIZE:
+                    return False
+
+                # The socket's send buffer is smaller than a full datagram (shrink the record, or drop it)
+                if len(payload) <= 1024:
+                    return True
+
+                payload = _fit(payload, len(payload) // 2)
+            else:
+                return True
+
+        # The collector is running, but has stopped draining its queue
+        return False
+
+    def _buffer(self, payload: bytes) -> None:
+        with open(self.pending, 'ab') as pending:
+            pending.write(payload.hex().encode() + b'\n')
+
+    def _replay(self) -> bool:
+        ''' Resubmits buffered records from the last delivered offset (the file is only removed once drained) '''
+
+        with open(self.pending, 'rb') as pending:
+            pending.seek(self._offset)
+
+            for line in pending:
+                if line.strip() and not self._submit(bytes.fromhex(line.decode())):
+                    return False
+
+                self._offset += len(line)
+
+        os.unlink(self.pending)
+        self._offset = 0
+
+        return True
+
+    def send(self, record: Record) -> None:
+        payload = record.pack()
+
+        with self._lock:
+            if self._down_since is not None:
+                if time.monotonic() - self._down_since < self.retry:
+                    self._buffer(payload)
+                    return
+
+                if not self._replay():
+                    self._down_since = time.monotonic()
+                    self._buffer(payload)
+                    return
+
+                self._down_since = None
+
+            if not self._submit(payload):
+                self._down_since = time.monotonic()
+                self._buffer(payload)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Central Log Collector')
+    parser.add_argument('--socket', default=default_socket)
+    parser.add_argument('--format', choices=list(codecs), default=None, help='Defaults to the "LOG_FORMAT" setting')
+    parser.add_argument('--max-bytes', type=int, default=8 * 1024 * 1024)
+    parser.add_argument('--backups', type=int, default=5)
+    args = parser.parse_args()
+
+    # Defaults to the format the loggers (and StatEngine) use, so statistics read the active file
+    from . import _settings
+
+    format = args.format or _settings()[1]
+    if format not in codecs:
+        parser.error(f'Unknown Log Format: {format}')
+
+    collector = LogCollector(args.socket, format=format, max_bytes=args.max_bytes, backups=args.backups)
+    signal.signal(signal.SIGTERM, lambda *_: collector._closed.set())
+
+    collector.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
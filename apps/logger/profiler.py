@@ -0,0 +1,123 @@
+'''
+
+Low-Overhead Sampling Profiler
+
+Periodically captures the stack of a single thread (by default, the thread running the event loop)
+and aggregates the samples into the "collapsed stack" format consumed by flamegraph tooling:
+
+    module:function;module:function;module:function COUNT
+
+Important Notes:
+    Profiles are recorded in "logger/data/profiles/"
+    Sampling happens on a daemon thread, the profiled code is never instrumented
+    Every coroutine sharing the sampled thread will appear in the profile (concurrent requests/events included)
+
+Usage:
+    with SamplingProfiler('route-index'):
+        ...
+
+    profiler = SamplingProfiler('window', duration=30)
+    profiler.start()
+
+'''
+
+
+import sys
+import time
+import threading
+
+from os import makedirs
+from os.path import abspath
+from datetime import datetime
+from collections import Counter
+
+
+class SamplingProfiler():
+    ''' Collapsed-Stack Sampler for a Single Thread '''
+
+    def __init__(self, label: str, *, interval: float = 0.005, duration: float = None, thread: int = None):
+        self.label = label
+        self.interval = interval
+        self.duration = duration
+        self.thread = thread or threading.get_ident()
+
+        self.samples = Counter()
+        self.path = None
+
+        self._stop = threading.Event()
+        self._sampler = None
+
+        self.dir = abspath(__file__).replace('profiler.py', 'data/profiles/')
+
+    '''
+        Sampling
+    '''
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f'{frame.f_globals.get("__name__", "?")}:{code.co_name}')
+            frame = frame.f_back
+
+        stack.reverse()
+
+        return ';'.join(stack)
+
+    def _sample(self) -> None:
+        deadline = time.monotonic() + self.duration if self.duration else None
+
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread)
+            if frame is not None:
+                self.samples[self._collapse(frame)] += 1
+
+            if deadline and time.monotonic() >= deadline:
+                self._save()
+                return
+
+    def _save(self) -> str:
+        if self.path:
+            return self.path
+
+        makedirs(self.dir, exist_ok=True)
+
+        stamp = datetime.now().strftime('%m-%d-%y_%H-%M-%S-%f')[:-3]
+        label = ''.join(char if char.isalnum() or char in '-_' else '_' for char in self.label)
+        path = f'{self.dir}{label}_{stamp}.folded'
+
+        with open(path, 'w+') as profile:
+            for stack, count in self.samples.most_common():
+                profile.write(f'{stack} {count}\n')
+
+        self.path = path
+
+        return path
+
+    '''
+        Controls
+    '''
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None and self._sampler.is_alive()
+
+    def start(self) -> 'SamplingProfiler':
+        self._sampler = threading.Thread(target=self._sample, name=f'profiler-{self.label}', daemon=True)
+        self._sampler.start()
+
+        return self
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+        return self._save()
+
+    def __enter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,250 @@
+'''
+
+Log Record Formats & Compressed Segments
+
+Every event is captured as a Record (epoch-millisecond timestamp, level index, locale, message)
+and can be written using one of 3 formats:
+
+    text        events.log      [LEVEL] MM-DD-YY HH:MM:SS:SSS (LOCATION) --> "ERROR MESSAGE"
+    json        events.jsonl    {"ts": 1623810161000, "level": 2, "locale": "security", "message": "..."}
+    binary      events.bin      <u64 timestamp> <u8 level> <u16 locale id> <u32 length> <message>
+
+Binary Format:
+    Locales are interned; the first use of a locale is preceded by a definition record
+    (level 255, message = locale name) which assigns its id for the remainder of the file.
+    Binary files must have a single writer, so they are only written by the collector.
+
+Segments:
+    Rotated files are stored as "<name>-<first timestamp>.seg"
+
+    4 bytes     Magic ("AVAS")
+    4 bytes     Header Length
+    N bytes     Header (JSON) - format, first & last timestamp, record count per level
+    ...         Gzip-Compressed Body
+
+    Readers can use the header to skip (or count) a whole segment without decompressing it.
+
+'''
+
+
+import os
+import gzip
+import json
+import struct
+
+from datetime import datetime
+from dataclasses import dataclass
+
+
+labels = ['TRACE', 'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+
+extensions = {
+    'text': '.log',
+    'json': '.jsonl',
+    'binary': '.bin'
+}
+
+binary_header = struct.Struct('<QBHI')
+datagram_header = struct.Struct('<BQH')
+
+segment_magic = b'AVAS'
+segment_length = struct.Struct('<I')
+
+DEFINITION = 255
+
+
+@dataclass
+class Record():
+    '''
+        Contains a single Log Event.
+
+        - Timestamp (Epoch Milliseconds)
+        - Level Index
+        - Locale
+        - Message
+    '''
+
+    timestamp: int
+    level: int
+    locale: str
+    message: str
+
+    @classmethod
+    def now(cls, level: int, locale: str, message: str) -> 'Record':
+        return cls(int(datetime.now().timestamp() * 1000), level, locale, str(message))
+
+    @property
+    def stamp(self) -> str:
+        return datetime.fromtimestamp(self.timestamp / 1000).strftime('%m-%d-%y %H:%M:%S:%f')[:-3]
+
+    '''
+        Collector Datagrams
+    '''
+
+    def pack(self) -> bytes:
+        locale = self.locale.encode('UTF-8')
+
+        return datagram_header.pack(self.level, self.timestamp, len(locale)) + locale + self.message.encode('UTF-8')
+
+    @classmethod
+    def unpack(cls, payload: bytes) -> 'Record':
+        level, timestamp, size = datagram_header.unpack_from(payload)
+        start = datagram_header.size
+
+        locale = payload[start:start + size].decode('UTF-8', 'replace')
+        message = payload[start + size:].decode('UTF-8', 'replace')
+
+        return cls(timestamp, level, locale, message)
+
+
+class TextCodec():
+    ''' Human-Readable Lines (the original logger format) '''
+
+    @staticmethod
+    def start(level: int) -> str:
+        return f'[{labels[level]}]'.ljust(12)
+
+    def encode(self, record: Record) -> bytes:
+        line = self.start(record.level) + f'{record.stamp}\t({record.locale})\t\t{record.message} \n'
+
+        return line.encode('UTF-8')
+
+    @staticmethod
+    def _parse(line: str) -> Record:
+        head, locale, *_, message = line.rstrip('\n').split('\t')
+
+        level = labels.index(head[:12].strip()[1:-1])
+        stamp = head[12:].strip()
+        moment = datetime.strptime(stamp, '%m-%d-%y %H:%M:%S:%f' if len(stamp) > 17 else '%m-%d-%y %H:%M:%S')
+
+        return Record(int(moment.timestamp() * 1000), level, locale.strip()[1:-1], message[:-1] if message.endswith(' ') else message)
+
+    def decode(self, stream) -> iter:
+        for line in stream:
+            if line.strip():
+                yield self._parse(line.decode('UTF-8', 'replace'))
+
+
+class JSONCodec():
+    ''' One JSON Object per Line '''
+
+    def encode(self, record: Record) -> bytes:
+        data = {'ts': record.timestamp, 'level': record.level, 'locale': record.locale, 'message': record.message}
+
+        return json.dumps(data, separators=(',', ':')).encode('UTF-8') + b'\n'
+
+    def decode(self, stream) -> iter:
+        for line in stream:
+            if line.strip():
+                data = json.loads(line)
+                yield Record(data['ts'], data['level'], data['locale'], data['message'])
+
+
+class BinaryCodec():
+    ''' Fixed-Width Binary Records with Interned Locales '''
+
+    def __init__(self):
+        self.locales = {}
+
+    def reset(self) -> None:
+        self.locales.clear()
+
+    def encode(self, record: Record) -> bytes:
+        output = b''
+
+        id = self.locales.get(record.locale)
+        if id is None:
+            id = self.locales[record.locale] = len(self.locales)
+            name = record.locale.encode('UTF-8')
+            output += binary_header.pack(record.timestamp, DEFINITION, id, len(name)) + name
+
+        message = record.message.encode('UTF-8')
+
+        return output + binary_header.pack(record.timestamp, record.level, id, len(message)) + message
+
+    def decode(self, stream) -> iter:
+        locales = {}
+
+        while True:
+            header = stream.read(binary_header.size)
+            if len(header) < binary_header.size:
+                return
+
+            timestamp, level, id, size = binary_header.unpack(header)
+            body = stream.read(size).decode('UTF-8', 'replace')
+
+            if level == DEFINITION:
+                locales[id] = body
+            else:
+                yield Record(timestamp, level, locales.get(id, '?'), body)
+
+
+codecs = {
+    'text': TextCodec,
+    'json': JSONCodec,
+    'binary': BinaryCodec
+}
+
+
+def read(path: str, format: str) -> iter:
+    ''' Iterates over the Records of an active (uncompressed) log file '''
+
+    try:
+        with open(path, 'rb') as log:
+            yield from codecs[format]().decode(log)
+    except FileNotFoundError:
+        return
+
+
+class Segment():
+    ''' Compressed, Indexed Log Segment '''
+
+    @staticmethod
+    def index(records: iter) -> dict:
+        header = {'first': None, 'last': None, 'counts': [0] * len(labels)}
+
+        for record in records:
+            if header['first'] is None:
+                header['first'] = record.timestamp
+
+            header['last'] = record.timestamp
+            header['counts'][record.level] += 1
+
+        return header
+
+    @staticmethod
+    def write(path: str, *, source: str, format: str, header: dict = None) -> str:
+        header = dict(header or Segment.index(read(source, format)), format=format)
+        name = os.path.basename(path)
+
+        segment = f'{path}-{header["first"] or 0:013d}.seg'
+        encoded = json.dumps(header).encode('UTF-8')
+
+        with open(source, 'rb') as raw, open(segment, 'wb') as output:
+            output.write(segment_magic + segment_length.pack(len(encoded)) + encoded)
+
+            with gzip.GzipFile(filename=name, mode='wb', fileobj=output) as body:
+                while chunk := raw.read(1024 * 1024):
+                    body.write(chunk)
+
+        return segment
+
+    @staticmethod
+    def header(path: str) -> dict:
+        with open(path, 'rb') as segment:
+            if segment.read(4) != segment_magic:
+                raise ValueError(f'{path} is not a log segment')
+
+            size, = segment_length.unpack(segment.read(segment_length.size))
+
+            return json.loads(segment.read(size))
+
+    @staticmethod
+    def records(path: str) -> iter:
+        with open(path, 'rb') as segment:
+            segment.read(4)
+            size, = segment_length.unpack(segment.read(segment_length.size))
+            header = json.loads(segment.read(size))
+
+            with gzip.GzipFile(mode='rb', fileobj=segment) as body:
+                yield from codecs[header['format']]().decode(body)